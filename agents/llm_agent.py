@@ -3,23 +3,48 @@ Achievit core reasoning is powered by Gemini-3-Flash from Google.
 Gemini-3-Flash is optimised for speed, efficiency and lower cost
 
 """
+import os
+
 import streamlit as st
 from google import genai
-from google.genai import errors
+from google.genai import types
+
+from agents.providers import FallbackProvider, LLMProvider, LocalPlanProvider
+from config import (
+    FALLBACK_COOLDOWN_SECONDS,
+    FALLBACK_MAX_ERRORS,
+    FALLBACK_SLOW_CALL_SECONDS,
+    LLM_FIRST_OUTPUT_SECONDS,
+    LLM_PROVIDER,
+    LLM_TIMEOUT_SECONDS,
+)
 
-GEMINI_API_KEY = st.secrets["GEMINI_API_KEY"]
-client = genai.Client(api_key=GEMINI_API_KEY)
+GEMINI_MODEL = "gemini-3-flash-preview"
 
+# GEMINI_BASE_URL points the client at a local fake backend for load tests.
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL")
 
-def generate_detailed_plan(
+
+def _gemini_api_key():
+    # Environment variables take precedence so headless services (api.py)
+    # can run without a .streamlit/secrets.toml.
+    if os.getenv("GEMINI_API_KEY"):
+        return os.getenv("GEMINI_API_KEY")
+    try:
+        return st.secrets["GEMINI_API_KEY"]
+    except Exception:
+        return None
+
+
+def build_prompt(
     goal: str,
     milestones: list[str],
     constraints: dict,
     progress: dict,
     subtasks: dict,
-):
+) -> str:
     """
-    Generate an adaptive, milestone-based academic plan.
+    Render the planning prompt sent to Gemini.
 
     progress: dict mapping milestone -> completion percentage (0–100)
     subtasks: dict mapping milestone -> {
@@ -28,7 +53,7 @@ def generate_detailed_plan(
     }
     """
 
-    prompt = f"""
+    return f"""
 You are a seasoned academic planning assistant.
 
 This system uses a FIXED heuristic structure.
@@ -90,30 +115,136 @@ RESPONSE FORMAT
 The plan must remain realistic, adaptive, and grounded in the execution data provided.
 """
 
-    try:
-        response = client.models.generate_content(
-            model="gemini-3-flash-preview",
-            contents=prompt,
-        )
 
-        return response.text
+class GeminiProvider(LLMProvider):
+    """
+    Gemini backend. Calls that exceed timeout_seconds are aborted and
+    raised, which lets FallbackProvider switch to the offline planner.
+    """
 
-    except errors.ServerError:
-        # Free-tier quota exceeded OR model/server overloaded
-        st.warning(
-            "⚠️ Gemini API free-tier limit may be exceeded or the server is overloaded.\n\n"
-            "Please wait a few minutes and try again."
-        )
-        return (
-            "⚠️ Unable to generate a plan right now due to temporary AI service limits. "
-            "Please try again later."
+    name = "gemini"
+
+    def __init__(self, api_key, model=GEMINI_MODEL, base_url=None, timeout_seconds=None):
+        self.model = model
+        self.client = genai.Client(
+            api_key=api_key,
+            http_options=types.HttpOptions(
+                base_url=base_url,
+                timeout=int(timeout_seconds * 1000) if timeout_seconds else None,
+            ),
         )
 
-    except errors.APIError:
-        st.error(
-            "❌ An unexpected error occurred while contacting the AI service."
+    def generate(self, **plan) -> str:
+        response = self.client.models.generate_content(
+            model=self.model,
+            contents=build_prompt(**plan),
         )
-        return (
-            "❌ An unexpected error occurred while generating your plan. "
-            "Please try again."
+        return response.text
+
+    def stream(self, **plan):
+        for chunk in self.client.models.generate_content_stream(
+            model=self.model,
+            contents=build_prompt(**plan),
+        ):
+            if chunk.text:
+                yield chunk.text
+
+    async def agenerate(self, **plan) -> str:
+        response = await self.client.aio.models.generate_content(
+            model=self.model,
+            contents=build_prompt(**plan),
         )
+        return response.text
+
+    async def astream(self, **plan):
+        async for chunk in await self.client.aio.models.generate_content_stream(
+            model=self.model,
+            contents=build_prompt(**plan),
+        ):
+            if chunk.text:
+                yield chunk.text
+
+
+def build_provider(kind=LLM_PROVIDER) -> LLMProvider:
+    """
+    kind:
+        "auto"   – Gemini, falling back to the offline planner on errors,
+                   no output within LLM_FIRST_OUTPUT_SECONDS, or repeated
+                   slow calls (offline only if no key)
+        "gemini" – Gemini only
+        "local"  – offline planner only
+    """
+    local = LocalPlanProvider()
+    if kind == "local":
+        return local
+
+    api_key = _gemini_api_key()
+    if api_key is None:
+        if kind == "gemini":
+            raise RuntimeError("GEMINI_API_KEY is not configured.")
+        return local
+
+    gemini = GeminiProvider(api_key, base_url=GEMINI_BASE_URL, timeout_seconds=LLM_TIMEOUT_SECONDS)
+    if kind == "gemini":
+        return gemini
+
+    return FallbackProvider(
+        gemini,
+        local,
+        max_errors=FALLBACK_MAX_ERRORS,
+        slow_call_seconds=FALLBACK_SLOW_CALL_SECONDS,
+        cooldown_seconds=FALLBACK_COOLDOWN_SECONDS,
+        first_output_seconds=LLM_FIRST_OUTPUT_SECONDS,
+    )
+
+
+provider = build_provider()
+
+
+async def agenerate_detailed_plan(
+    goal: str,
+    milestones: list[str],
+    constraints: dict,
+    progress: dict,
+    subtasks: dict,
+) -> str:
+    """
+    Generate an adaptive, milestone-based academic plan (headless callers).
+
+    See build_prompt for the shape of progress and subtasks.
+
+    Shares the module-level provider (and its pooled HTTP connections).
+    Provider errors are raised rather than rendered, so callers can map
+    them to their own responses.
+    """
+
+    return await provider.agenerate(
+        goal=goal,
+        milestones=milestones,
+        constraints=constraints,
+        progress=progress,
+        subtasks=subtasks,
+    )
+
+
+def stream_detailed_plan(
+    goal: str,
+    milestones: list[str],
+    constraints: dict,
+    progress: dict,
+    subtasks: dict,
+):
+    """
+    Streaming plan generation used by background jobs.
+
+    Yields text chunks as they are produced. Provider errors are raised
+    rather than rendered, since jobs run outside the Streamlit script.
+    """
+
+    yield from provider.stream(
+        goal=goal,
+        milestones=milestones,
+        constraints=constraints,
+        progress=progress,
+        subtasks=subtasks,
+    )
@@ -0,0 +1,93 @@
+"""
+Offline plan renderer for ACHIEVIT.
+
+Produces a structured, deterministic plan from the heuristic milestones,
+subtask execution status and constraints, without calling an LLM. Used as
+the fallback when Gemini is unavailable and for tests with no network.
+"""
+from datetime import date
+
+# Rough effort per subtask, in hours, by skill level.
+HOURS_PER_SUBTASK = {
+    "Novice": 4,
+    "Intermediate": 3,
+    "Expert": 2,
+}
+
+
+def _days_left(deadline):
+    try:
+        return (date.fromisoformat(str(deadline)) - date.today()).days
+    except ValueError:
+        return None
+
+
+def render_plan(
+    goal: str,
+    milestones: list[str],
+    constraints: dict,
+    progress: dict,
+    subtasks: dict,
+) -> str:
+    """
+    Render a milestone-by-milestone plan in the same shape as the LLM plan.
+
+    progress: dict mapping milestone -> completion percentage (0–100)
+    subtasks: dict mapping milestone -> {
+        "completed": [subtasks],
+        "pending": [subtasks]
+    }
+    """
+    hours_per_day = constraints.get("hours_per_day") or 1
+    skill_level = constraints.get("skill_level", "Intermediate")
+    days_left = _days_left(constraints.get("deadline"))
+
+    per_subtask = HOURS_PER_SUBTASK.get(skill_level, HOURS_PER_SUBTASK["Intermediate"])
+    pending_total = sum(len(subtasks.get(m, {}).get("pending", [])) for m in milestones)
+    hours_needed = pending_total * per_subtask
+    hours_available = days_left * hours_per_day if days_left is not None else None
+    overall = sum(progress.get(m, 0) for m in milestones) / len(milestones) if milestones else 0
+
+    lines = [
+        "# Adaptive Plan",
+        "_Generated by ACHIEVIT's offline planner while the AI service is unavailable._",
+        "",
+        f"**Goal:** {goal}",
+        f"**Time budget:** {hours_per_day} h/day • **Skill level:** {skill_level} • "
+        f"**Deadline:** {constraints.get('deadline')}"
+        + (f" ({days_left} days left)" if days_left is not None else ""),
+        f"**Overall progress:** {overall:.0f}% • **Estimated work remaining:** ~{hours_needed} h",
+    ]
+
+    if hours_available is not None and hours_needed > hours_available:
+        lines += [
+            "",
+            f"> ⚠️ About {hours_needed} h of work remain but only ~{max(hours_available, 0)} h are available "
+            "before the deadline. Prioritise the earliest unfinished milestone and trim optional work.",
+        ]
+
+    first_open = next((m for m in milestones if progress.get(m, 0) < 100), None)
+
+    for index, milestone in enumerate(milestones, start=1):
+        pct = progress.get(milestone, 0)
+        status = subtasks.get(milestone, {"completed": [], "pending": []})
+
+        lines += ["", f"## Milestone {index}: {milestone} — {pct}% complete"]
+
+        if pct >= 100:
+            lines.append("✅ Complete. Keep your notes from this stage to hand and move on.")
+            continue
+
+        if status["completed"]:
+            lines.append(f"**Done so far:** {', '.join(status['completed'])}.")
+
+        focus = "Focus now" if milestone == first_open else "Up next"
+        lines.append(f"**{focus}:**")
+        for step, subtask in enumerate(status["pending"], start=1):
+            lines.append(f"{step}. {subtask} (~{per_subtask} h)")
+
+        days = -(-len(status["pending"]) * per_subtask // hours_per_day)
+        lines.append(f"At {hours_per_day} h/day this milestone needs about {days} day(s).")
+
+    # Blank lines keep each entry its own markdown paragraph.
+    return "\n\n".join(line for line in lines if line)
@@ -0,0 +1,65 @@
+"""
+Background plan generation jobs.
+
+Runs the LLM layer on the shared job worker pool so Streamlit reruns never
+block on a Gemini round-trip. Partial output is published as it streams in.
+"""
+from google.genai import errors
+
+from agents.llm_agent import stream_detailed_plan
+from utils import job_queue
+
+GENERATE_PLAN = "generate_plan"
+
+
+@job_queue.register(GENERATE_PLAN)
+def run_generate_plan(params, report):
+    """
+    params:
+    {
+        "llm": kwargs for stream_detailed_plan,
+        ...: any UI state the caller needs to restore after a reconnect
+    }
+    """
+    text = ""
+    try:
+        for chunk in stream_detailed_plan(**params["llm"]):
+            text += chunk
+            report(text)
+
+    except errors.ServerError:
+        # Free-tier quota exceeded OR model/server overloaded
+        raise job_queue.JobError(
+            "⚠️ Gemini API free-tier limit may be exceeded or the server is overloaded. "
+            "Please wait a few minutes and try again."
+        )
+
+    except errors.APIError:
+        raise job_queue.JobError(
+            "❌ An unexpected error occurred while contacting the AI service. Please try again."
+        )
+
+    return text
+
+
+def submit_plan_job(goal, milestones, constraints, progress, subtasks, speculative=False, **context):
+    """
+    Queue plan generation and return the job id.
+
+    context is stored with the job so the UI can restore its state from
+    the job record after a browser refresh.
+    """
+    return job_queue.submit(
+        GENERATE_PLAN,
+        {
+            "llm": {
+                "goal": goal,
+                "milestones": milestones,
+                "constraints": constraints,
+                "progress": progress,
+                "subtasks": subtasks,
+            },
+            **context,
+        },
+        speculative=speculative,
+    )
@@ -0,0 +1,166 @@
+"""
+LLM provider interface for ACHIEVIT.
+
+Providers turn the plan inputs (goal, milestones, constraints, progress,
+subtasks) into plan text. llm_agent picks the active provider; this module
+holds the interface, the offline provider and the fallback wrapper.
+"""
+import abc
+import asyncio
+import queue
+import threading
+import time
+
+from agents.local_planner import render_plan
+
+
+class LLMProvider(abc.ABC):
+    """
+    Base provider. Subclasses implement generate(); stream(), agenerate()
+    and astream() default to wrapping it.
+    """
+
+    name = "base"
+
+    @abc.abstractmethod
+    def generate(self, **plan) -> str:
+        ...
+
+    def stream(self, **plan):
+        yield self.generate(**plan)
+
+    async def agenerate(self, **plan) -> str:
+        return self.generate(**plan)
+
+    async def astream(self, **plan):
+        yield await self.agenerate(**plan)
+
+
+class LocalPlanProvider(LLMProvider):
+    """
+    Deterministic offline provider; renders in milliseconds with no network.
+    """
+
+    name = "local"
+
+    def generate(self, **plan) -> str:
+        return render_plan(**plan)
+
+
+_END = object()
+
+
+def _pump(chunks, out, stop):
+    """
+    Copy chunks into out from a worker thread, ending with _END or the
+    exception that stopped the iteration.
+    """
+    try:
+        for chunk in chunks:
+            if stop.is_set():
+                return
+            out.put(chunk)
+        out.put(_END)
+    except Exception as exc:
+        out.put(exc)
+
+
+class FallbackProvider(LLMProvider):
+    """
+    Use primary, falling back to fallback when it errors or has produced
+    no output within first_output_seconds.
+
+    After max_errors consecutive failed or slow (> slow_call_seconds) calls,
+    primary is skipped entirely for cooldown_seconds so users are not made
+    to wait on a struggling service.
+    """
+
+    name = "fallback"
+
+    def __init__(
+        self,
+        primary,
+        fallback,
+        max_errors=3,
+        slow_call_seconds=60.0,
+        cooldown_seconds=120.0,
+        first_output_seconds=15.0,
+    ):
+        self.primary = primary
+        self.fallback = fallback
+        self.max_errors = max_errors
+        self.slow_call_seconds = slow_call_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self.first_output_seconds = first_output_seconds
+        self._strikes = 0
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+
+    def primary_available(self) -> bool:
+        return time.monotonic() >= self._open_until
+
+    def _record(self, ok, elapsed=0.0):
+        with self._lock:
+            if ok and elapsed <= self.slow_call_seconds:
+                self._strikes = 0
+                return
+            self._strikes += 1
+            if self._strikes >= self.max_errors:
+                self._open_until = time.monotonic() + self.cooldown_seconds
+                self._strikes = 0
+
+    def generate(self, **plan) -> str:
+        return "".join(self.stream(**plan))
+
+    def stream(self, **plan):
+        if not self.primary_available():
+            yield from self.fallback.stream(**plan)
+            return
+
+        # The primary runs on a worker thread so a hung request can be
+        # abandoned once first_output_seconds pass; the thread itself ends
+        # when the client's own timeout fires.
+        start = time.monotonic()
+        chunks, stop = queue.Queue(), threading.Event()
+        threading.Thread(target=_pump, args=(self.primary.stream(**plan), chunks, stop), daemon=True).start()
+        try:
+            try:
+                chunk = chunks.get(timeout=self.first_output_seconds)
+            except queue.Empty:
+                chunk = TimeoutError(f"no output from {self.primary.name} in {self.first_output_seconds}s")
+
+            produced = False
+            while chunk is not _END:
+                if isinstance(chunk, Exception):
+                    self._record(False)
+                    # Text already shown cannot be swapped out mid-stream.
+                    if produced:
+                        raise chunk
+                    yield from self.fallback.stream(**plan)
+                    return
+                produced = True
+                yield chunk
+                chunk = chunks.get()
+        finally:
+            stop.set()
+
+        self._record(True, time.monotonic() - start)
+
+    async def agenerate(self, **plan) -> str:
+        if not self.primary_available():
+            return await self.fallback.agenerate(**plan)
+
+        start = time.monotonic()
+        chunks = self.primary.astream(**plan)
+        try:
+            try:
+                first = await asyncio.wait_for(anext(chunks, ""), self.first_output_seconds)
+                text = first + "".join([chunk async for chunk in chunks])
+            finally:
+                await chunks.aclose()
+        except Exception:
+            self._record(False)
+            return await self.fallback.agenerate(**plan)
+
+        self._record(True, time.monotonic() - start)
+        return text
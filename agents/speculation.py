@@ -0,0 +1,174 @@
+"""
+Speculative pre-generation of adapted plans.
+
+When saved progress crosses a meaningful threshold (a milestone completes or
+overall progress moves into a new PROGRESS_STEP band), an adaptation job is
+started in the background. If the progress fingerprint still matches when
+the user clicks "Adapt Plan", that job is served instead of a cold call.
+
+Speculation is bounded per goal, per process and per hour, is skipped while
+the LLM is in fallback, and runs on the job queue's speculative lane so it
+never holds a worker an interactive request needs. Submitting an
+interactive job cancels running speculation that has not been adopted.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import deque
+
+from agents import llm_agent
+from agents.plan_jobs import submit_plan_job
+from config import (
+    SPECULATION_ENABLED,
+    SPECULATION_MAX_BACKLOG,
+    SPECULATION_MAX_PER_GOAL,
+    SPECULATION_MAX_PER_HOUR,
+    SPECULATION_PROGRESS_STEP,
+)
+from utils import job_queue
+from utils.progress_manager import compute_progress, summarize_subtasks
+
+_budget_lock = threading.Lock()
+_recent_starts = deque()
+# goal_id -> speculative jobs started, kept per process so a browser
+# refresh does not reset the per-goal cap.
+_goal_starts = {}
+
+
+def fingerprint(goal, constraints, progress_matrix):
+    """
+    Hash of everything the adapted plan depends on.
+    """
+    payload = json.dumps([goal, constraints, progress_matrix], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def crossed_threshold(previous_matrix, current_matrix):
+    """
+    True when a milestone newly reached 100% or overall progress moved
+    into a different PROGRESS_STEP band.
+    """
+    before = compute_progress(previous_matrix) if previous_matrix else {}
+    after = compute_progress(current_matrix)
+
+    if any(pct == 100 and before.get(m, 0) < 100 for m, pct in after.items()):
+        return True
+
+    def band(computed):
+        overall = sum(computed.values()) / len(computed) if computed else 0
+        return int(overall // SPECULATION_PROGRESS_STEP)
+
+    return band(before) != band(after)
+
+
+def _llm_worth_speculating():
+    provider = llm_agent.provider
+    if provider.name == "local":
+        # The offline planner is instant; nothing to pre-generate.
+        return False
+    if hasattr(provider, "primary_available") and not provider.primary_available():
+        # Gemini is failing or over quota; don't add to the pressure.
+        return False
+    return True
+
+
+def _take_budget(goal_id):
+    if job_queue.speculative_backlog() >= SPECULATION_MAX_BACKLOG:
+        return False
+
+    now = time.monotonic()
+    with _budget_lock:
+        if _goal_starts.get(goal_id, 0) >= SPECULATION_MAX_PER_GOAL:
+            return False
+        while _recent_starts and now - _recent_starts[0] > 3600:
+            _recent_starts.popleft()
+        if len(_recent_starts) >= SPECULATION_MAX_PER_HOUR:
+            return False
+        _recent_starts.append(now)
+        _goal_starts[goal_id] = _goal_starts.get(goal_id, 0) + 1
+    return True
+
+
+def _cancel_stale(state):
+    if state.get("speculative_job"):
+        job_queue.cancel(state["speculative_job"], reason="Superseded by newer progress.")
+    state["speculative_job"] = None
+    state["speculative_fingerprint"] = None
+
+
+def on_progress_saved(state, previous_matrix):
+    """
+    Call after progress is saved. state is the session state holding
+    goal, goal_id, constraints, milestones and progress.
+    """
+    if not SPECULATION_ENABLED:
+        return
+
+    current = fingerprint(state["goal"], state["constraints"], state["progress"])
+    if state.get("speculative_fingerprint") == current:
+        return
+
+    # Whatever was speculated no longer matches the user's progress.
+    _cancel_stale(state)
+
+    if not crossed_threshold(previous_matrix, state["progress"]):
+        return
+    if not _llm_worth_speculating() or not _take_budget(state["goal_id"]):
+        return
+
+    state["speculative_job"] = submit_plan_job(
+        goal=state["goal"],
+        milestones=state["milestones"],
+        constraints=state["constraints"],
+        progress=compute_progress(state["progress"]),
+        subtasks=summarize_subtasks(state["progress"]),
+        speculative=True,
+    )
+    state["speculative_fingerprint"] = current
+
+
+def claim(state):
+    """
+    Return the speculative job id if it matches the current progress and
+    is running or done, so the caller can adopt or serve it.
+    Otherwise cancel it and return None.
+    """
+    job_id = state.get("speculative_job")
+    if not job_id:
+        return None
+
+    current = fingerprint(state["goal"], state["constraints"], state["progress"])
+    job = job_queue.get(job_id)
+    usable = (
+        job is not None
+        and state.get("speculative_fingerprint") == current
+        # A job still queued has cost nothing yet; an interactive job is
+        # scheduled ahead of it instead.
+        and job["status"] in (job_queue.RUNNING, job_queue.DONE)
+        and job_queue.adopt(job_id)
+    )
+
+    if not usable:
+        _cancel_stale(state)
+        return None
+
+    state["speculative_job"] = None
+    state["speculative_fingerprint"] = None
+    return job_id
+
+
+def ready(state):
+    """
+    True when a matching speculative result is already available.
+    """
+    job_id = state.get("speculative_job")
+    if not job_id:
+        return False
+    job = job_queue.get(job_id)
+    current = fingerprint(state["goal"], state["constraints"], state["progress"])
+    return (
+        job is not None
+        and job["status"] == job_queue.DONE
+        and state.get("speculative_fingerprint") == current
+    )
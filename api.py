@@ -0,0 +1,229 @@
+_= """
+Headless HTTP API for ACHIEVIT.
+
+Serves the same heuristic + LLM pipeline as app.py without a browser session,
+so the planner can sit behind a load balancer or be called from an LMS.
+
+Run with:
+    uvicorn api:app --host 0.0.0.0 --port 8000 --workers 4
+"""
+import asyncio
+import re
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import date
+from functools import partial
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import Response
+from google.genai import errors
+from pydantic import BaseModel
+
+from agents.heuristic import generate_plan, initialize_progress
+from agents.llm_agent import agenerate_detailed_plan
+from config import (
+    API_MAX_CONCURRENT_LLM_CALLS,
+    API_WORKER_THREADS,
+    DEFAULT_HOURS_PER_DAY,
+    DEFAULT_SKILL_LEVEL,
+)
+from utils import plan_store, progress_manager
+from utils.exporters import plan_to_docx
+from utils.progress_manager import compute_progress, summarize_subtasks
+from utils.validation import validate_goal_input
+
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+# Blocking work (progress file IO, DOCX rendering) runs on this pool so the
+# event loop stays free for in-flight LLM calls.
+_pool = ThreadPoolExecutor(max_workers=API_WORKER_THREADS, thread_name_prefix="achievit-api")
+_llm_slots: asyncio.Semaphore | None = None
+
+
+@asynccontextmanager
+async def lifespan(_app):
+    global _llm_slots
+    _llm_slots = asyncio.Semaphore(API_MAX_CONCURRENT_LLM_CALLS)
+    yield
+    _pool.shutdown(wait=False)
+
+
+app = FastAPI(title="ACHIEVIT API", lifespan=lifespan)
+
+
+
+# Request Models
+class PlanRequest(BaseModel):
+    goal: str
+    deadline: date
+    hours_per_day: int = DEFAULT_HOURS_PER_DAY
+    skill_level: str = DEFAULT_SKILL_LEVEL
+
+
+class ProgressPatch(BaseModel):
+    execution: dict[str, dict[str, bool]]
+
+
+class ExportRequest(BaseModel):
+    # Either inline text, or a stored version (latest when both are omitted).
+    plan_text: str | None = None
+    version: int | None = None
+    title: str = "ACHIEVIT – Roadmap Plan"
+    include_progress: bool = True
+
+
+
+# Helpers
+async def _run_blocking(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_pool, partial(fn, *args, **kwargs))
+
+
+async def _generate(goal, milestones, constraints, progress_matrix):
+    try:
+        async with _llm_slots:
+            return await agenerate_detailed_plan(
+                goal=goal,
+                milestones=milestones,
+                constraints=constraints,
+                progress=compute_progress(progress_matrix),
+                subtasks=summarize_subtasks(progress_matrix),
+            )
+    except errors.ServerError:
+        # Free-tier quota exceeded OR model/server overloaded
+        raise HTTPException(
+            status_code=503,
+            detail="AI service limits reached or server overloaded. Please try again later.",
+        )
+    except errors.APIError:
+        raise HTTPException(
+            status_code=502,
+            detail="An unexpected error occurred while contacting the AI service.",
+        )
+
+
+async def _load_record(goal_id):
+    record = await _run_blocking(progress_manager.load_progress, goal_id)
+    if not record or "execution" not in record:
+        raise HTTPException(status_code=404, detail=f"No progress found for goal '{goal_id}'.")
+    return record
+
+
+
+# Endpoints
+@app.post("/plans", status_code=201)
+async def create_plan(req: PlanRequest):
+    errors_found = validate_goal_input(req.goal, req.hours_per_day, req.deadline)
+    if errors_found:
+        raise HTTPException(status_code=422, detail=errors_found)
+
+    goal_id = progress_manager.goal_id_for(req.goal)
+    constraints = {
+        "hours_per_day": req.hours_per_day,
+        "skill_level": req.skill_level,
+        "deadline": str(req.deadline),
+    }
+    milestones = generate_plan(req.goal, constraints)
+    progress_matrix = initialize_progress(milestones, req.goal)
+
+    plan_text = await _generate(req.goal, milestones, constraints, progress_matrix)
+
+    computed = compute_progress(progress_matrix)
+    await _run_blocking(
+        progress_manager.save_progress,
+        goal_id,
+        execution_matrix=progress_matrix,
+        computed_progress=computed,
+        goal=req.goal,
+        constraints=constraints,
+    )
+    version = await _run_blocking(plan_store.save_version, goal_id, plan_text, "roadmap")
+
+    return {
+        "goal_id": goal_id,
+        "goal": req.goal,
+        "constraints": constraints,
+        "milestones": milestones,
+        "execution": progress_matrix,
+        "computed": computed,
+        "plan": plan_text,
+        "version": version,
+    }
+
+
+@app.get("/progress/{goal_id:path}")
+async def get_progress(goal_id: str):
+    record = await _load_record(goal_id)
+    return {"goal_id": goal_id, **record}
+
+
+@app.patch("/progress/{goal_id:path}")
+async def patch_progress(goal_id: str, patch: ProgressPatch):
+    try:
+        record = await _run_blocking(progress_manager.patch_progress, goal_id, patch.execution)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"No progress found for goal '{goal_id}'.")
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {"goal_id": goal_id, "execution": record["execution"], "computed": record["computed"]}
+
+
+@app.post("/plans/{goal_id:path}/adapt")
+async def adapt_plan(goal_id: str):
+    record = await _load_record(goal_id)
+    if "goal" not in record or "constraints" not in record:
+        raise HTTPException(
+            status_code=409,
+            detail="Goal and constraints were not stored for this goal; create the plan via POST /plans.",
+        )
+
+    execution = record["execution"]
+    plan_text = await _generate(
+        record["goal"],
+        list(execution.keys()),
+        record["constraints"],
+        execution,
+    )
+    computed = compute_progress(execution)
+    version = await _run_blocking(plan_store.save_version, goal_id, plan_text, "adapted", computed)
+    return {"goal_id": goal_id, "computed": computed, "plan": plan_text, "version": version}
+
+
+@app.get("/plans/{goal_id:path}/versions")
+async def list_plan_versions(goal_id: str):
+    return {"goal_id": goal_id, "versions": await _run_blocking(plan_store.list_versions, goal_id)}
+
+
+@app.get("/plans/{goal_id:path}/versions/{version}")
+async def get_plan_version(goal_id: str, version: int):
+    stored = await _run_blocking(plan_store.load_version, goal_id, version)
+    if stored is None:
+        raise HTTPException(status_code=404, detail=f"No version {version} for goal '{goal_id}'.")
+    return {"goal_id": goal_id, **stored}
+
+
+@app.post("/plans/{goal_id:path}/export")
+async def export_plan(goal_id: str, req: ExportRequest):
+    record = await _run_blocking(progress_manager.load_progress, goal_id)
+
+    plan_text = req.plan_text
+    if plan_text is None:
+        stored = await _run_blocking(plan_store.load_version, goal_id, req.version)
+        if stored is None:
+            raise HTTPException(status_code=404, detail=f"No stored plan for goal '{goal_id}'.")
+        plan_text = stored["text"]
+
+    buffer = await _run_blocking(
+        plan_to_docx,
+        title=req.title,
+        goal=record.get("goal", goal_id),
+        constraints=record.get("constraints", {}),
+        plan_text=plan_text,
+        progress=record.get("computed") if req.include_progress else None,
+    )
+    filename = re.sub(r"[^A-Za-z0-9_.-]", "_", goal_id)[:100]
+    return Response(
+        buffer.getvalue(),
+        media_type=DOCX_MIME,
+        headers={"Content-Disposition": f'attachment; filename="{filename}_plan.docx"'},
+    )
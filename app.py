@@ -1,35 +1,19 @@
+import uuid
+
 import streamlit as st
-from datetime import date, datetime
+from datetime import date, datetime, timezone
 
 from agents.heuristic import (
     generate_plan,
     initialize_progress,
 )
-from agents.llm_agent import generate_detailed_plan
+from agents import speculation
+from agents.plan_jobs import submit_plan_job
 from utils.validation import validate_goal_input
-from utils import progress_manager
+from utils import job_queue, plan_store, profiling, progress_manager
+from utils.progress_manager import compute_progress, summarize_subtasks
 from utils.exporters import plan_to_docx
-
-
-
-# Helper Functions
-def compute_progress(progress_matrix):
-    computed = {}
-    for milestone, subtasks in progress_matrix.items():
-        total = len(subtasks)
-        done = sum(subtasks.values())
-        computed[milestone] = int((done / total) * 100)
-    return computed
-
-
-def summarize_subtasks(progress_matrix):
-    summary = {}
-    for milestone, subtasks in progress_matrix.items():
-        summary[milestone] = {
-            "completed": [s for s, done in subtasks.items() if done],
-            "pending": [s for s, done in subtasks.items() if not done],
-        }
-    return summary
+from utils.blob_store import blobs
 
 
 
@@ -40,18 +24,114 @@ defaults = {
     "constraints": {},
     "milestones": [],
     "progress": {},
-    "detailed_plan": "",
-    "detailed_plan_original": "",
+    # Large artifacts are kept in the blob store; session state holds refs.
+    "detailed_plan_ref": None,
+    "detailed_plan_original_ref": None,
     "start_date": None,
     "goal_id": "",
     "adapted": False,
     "show_execution": False,
+    "roadmap_job": None,
+    "adapt_job": None,
+    "speculative_job": None,
+    "speculative_fingerprint": None,
 }
 
 for key, value in defaults.items():
     if key not in st.session_state:
         st.session_state[key] = value
 
+if "session_key" not in st.session_state:
+    st.session_state.session_key = uuid.uuid4().hex
+
+# Opt-in rerun profiling (ACHIEVIT_PROFILE=1, see profile_app.py)
+profiling.start_run(st.session_state.session_key)
+
+# A fresh session (e.g. after a browser refresh) reconnects to the
+# generation jobs recorded in the URL instead of losing the work.
+if not st.session_state.plan_generated and not st.session_state.roadmap_job:
+    for job_key in ("roadmap_job", "adapt_job"):
+        if job_key in st.query_params:
+            st.session_state[job_key] = st.query_params[job_key]
+
+
+
+# Background Job Helpers
+@st.fragment(run_every=1.0)
+def show_job_progress(job_id, waiting_message):
+    job = job_queue.get(job_id)
+    if job is None or job["status"] in job_queue.FINISHED:
+        st.rerun()
+
+    st.info(f"{waiting_message} ({job['status']})")
+    if job["result"]:
+        st.write(job["result"])
+
+
+def poll_job(job_key, waiting_message):
+    """
+    Return the finished job tracked under session_state[job_key],
+    or None while it is still queued or running.
+    """
+    with profiling.section(f"poll_{job_key}"):
+        job = job_queue.get(st.session_state[job_key])
+        if job is None:
+            st.session_state[job_key] = None
+            return None
+
+        if job["status"] in job_queue.FINISHED:
+            st.session_state[job_key] = None
+            return job
+
+        show_job_progress(job["id"], waiting_message)
+        return None
+
+
+def store_session_blob(key, data):
+    """
+    Keep data in the blob store under session_state[key], releasing the
+    blob it replaces.
+    """
+    previous = st.session_state[key]
+    ref = blobs.put(data, st.session_state.session_key)
+    if previous and previous != ref:
+        blobs.untrack(st.session_state.session_key, previous)
+    st.session_state[key] = ref
+
+
+def clear_session_blob(key):
+    if st.session_state[key]:
+        blobs.untrack(st.session_state.session_key, st.session_state[key])
+    st.session_state[key] = None
+
+
+def session_plan_text(key, kind):
+    """
+    Plan text kept in the blob store under session_state[key]. If the blob
+    is gone (e.g. the session idled out and was released), the latest
+    stored plan version of that kind is reloaded and kept again.
+    """
+    try:
+        return blobs.get_text(st.session_state[key], st.session_state.session_key)
+    except FileNotFoundError:
+        pass
+
+    versions = [v for v in plan_store.list_versions(st.session_state.goal_id) if v["kind"] == kind]
+    if not versions:
+        st.error("❌ This plan is no longer available. Please start a new goal.")
+        st.stop()
+    text = plan_store.load_version(st.session_state.goal_id, versions[-1]["version"])["text"]
+    store_session_blob(key, text.encode("utf-8"))
+    return text
+
+
+def show_job_timings(job):
+    timings = job["timings"]
+    st.caption(
+        f"⏱️ queued {timings['queued_s']}s • first output {timings['first_output_s']}s • "
+        f"total {timings['run_s']}s"
+    )
+
 
 
 # Page Setup
@@ -136,17 +216,17 @@ System operation starts here based on validated inputs: Goal type, goal descript
 
 '''
 if st.button("🚀 Get Roadmap", type="primary"):
-    errors = validate_goal_input(goal_input, hours_per_day, deadline)
+    with profiling.action("get_roadmap"):
+        errors = validate_goal_input(goal_input, hours_per_day, deadline)
 
-    if errors:
-        for e in errors:
-            st.error(e)
-        st.stop()
+        if errors:
+            for e in errors:
+                st.error(e)
+            st.stop()
 
-    with st.spinner("🧠Thinking through your goal and constraints..."):
         try:
             temp_goal = goal_input
-            temp_goal_id = goal_input.lower().replace(" ", "_")
+            temp_goal_id = progress_manager.goal_id_for(goal_input)
 
             temp_constraints = {
                 "hours_per_day": hours_per_day,
@@ -163,33 +243,66 @@ if st.button("🚀 Get Roadmap", type="primary"):
                 st.error("❌ Internal planning error. Please try again.")
                 st.stop()
 
-            plan_text = generate_detailed_plan(
+            job_id = submit_plan_job(
                 goal=temp_goal,
                 milestones=temp_milestones,
                 constraints=temp_constraints,
                 progress=compute_progress(temp_progress),
                 subtasks=summarize_subtasks(temp_progress),
+                goal_id=temp_goal_id,
+                start_date=str(temp_start_date),
+                execution=temp_progress,
             )
 
         except Exception:
             st.error("❌ AI service unavailable. Please try again.")
             st.stop()
 
-    st.session_state.update({
-        "plan_generated": True,
-        "adapted": False,
-        "goal": temp_goal,
-        "goal_id": temp_goal_id,
-        "constraints": temp_constraints,
-        "start_date": temp_start_date,
-        "milestones": temp_milestones,
-        "progress": temp_progress,
-        "detailed_plan_original": plan_text,
-        "detailed_plan": plan_text,
-        "show_execution": False,
-    })
+        st.session_state.roadmap_job = job_id
+        st.session_state.adapt_job = None
+        st.query_params.clear()
+        st.query_params["roadmap_job"] = job_id
+
+
+if st.session_state.roadmap_job:
+    job = poll_job("roadmap_job", "🧠Thinking through your goal and constraints...")
+
+    if job and job["status"] != job_queue.DONE:
+        st.error(job["error"])
+
+    elif job:
+        params = job["params"]
+        progress = params["execution"]
+
+        # Reconnecting after a refresh: prefer ticks saved since the job ran.
+        saved = progress_manager.load_progress(params["goal_id"])
+        # Naive UTC, to compare with save_progress timestamps.
+        job_created = (
+            datetime.fromtimestamp(job["created_at"], timezone.utc).replace(tzinfo=None).isoformat()
+        )
+        resumed = bool(saved.get("execution")) and saved.get("last_updated", "") > job_created
+        if resumed:
+            progress = saved["execution"]
+
+        store_session_blob("detailed_plan_original_ref", job["result"].encode("utf-8"))
+        clear_session_blob("detailed_plan_ref")
+
+        st.session_state.update({
+            "plan_generated": True,
+            "adapted": False,
+            "goal": params["llm"]["goal"],
+            "goal_id": params["goal_id"],
+            "constraints": params["llm"]["constraints"],
+            "start_date": date.fromisoformat(params["start_date"]),
+            "milestones": params["llm"]["milestones"],
+            "progress": progress,
+            "show_execution": resumed,
+        })
+
+        plan_store.save_version(params["goal_id"], job["result"], "roadmap", job_id=job["id"])
 
-    st.success(f"✅ Analysis of your {goal_type} goal and constaint completed")
+        st.success(f"✅ Analysis of your {goal_type} goal and constaint completed")
+        show_job_timings(job)
 
 
 # Display  Road Map Plan
@@ -200,21 +313,26 @@ LLM agent presents clean and downloadable structured roadmap plan that users hav
 if st.session_state.plan_generated:
     st.markdown("---")
     st.subheader(f"📄 Here is the Road Map towards  Achieving your {goal_type} goal target")
-    st.write(st.session_state.detailed_plan_original)
+    roadmap_text = session_plan_text("detailed_plan_original_ref", "roadmap")
+    st.write(roadmap_text)
 
     st.markdown("---")
     st.subheader("💾 Download Roadmap Plan")
 
-    original_docx = plan_to_docx(
-        title="ACHIEVIT – Roadmap Plan",
-        goal=st.session_state.goal,
-        constraints=st.session_state.constraints,
-        plan_text=st.session_state.detailed_plan_original,
-    )
+    # Streamlit calls this only when the button is clicked (on its own
+    # thread, so it must not read session_state), rather than holding the
+    # DOCX bytes for every session on every rerun.
+    def roadmap_docx(goal=st.session_state.goal, constraints=st.session_state.constraints, plan_text=roadmap_text):
+        return plan_to_docx(
+            title="ACHIEVIT – Roadmap Plan",
+            goal=goal,
+            constraints=constraints,
+            plan_text=plan_text,
+        ).getvalue()
 
     st.download_button(
         "⬇️ Download Roadmap Plan",
-        data=original_docx,
+        data=roadmap_docx,
         file_name=f"{st.session_state.goal_id}_original_plan.docx",
         mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
         type="primary",
@@ -234,8 +352,9 @@ if st.session_state.plan_generated and not st.session_state.show_execution:
     st.caption("Click to Reveal actionable subtasks and begin execution.")
 
     if st.button("▶️ Generate Planned Tasks and Activities"):
-        st.session_state.show_execution = True
-        st.rerun()
+        with profiling.action("reveal_tasks"):
+            st.session_state.show_execution = True
+            st.rerun()
 
 
 # Plan Execution Layer
@@ -250,24 +369,31 @@ if st.session_state.plan_generated and st.session_state.show_execution:
 
     updated_progress = {}
 
-    for milestone, subtasks in st.session_state.progress.items():
-        st.markdown(f"### 🎯 {milestone}")
-        updated_progress[milestone] = {}
+    with profiling.section("checkbox_loop"):
+        for milestone, subtasks in st.session_state.progress.items():
+            st.markdown(f"### 🎯 {milestone}")
+            updated_progress[milestone] = {}
 
-        for subtask, completed in subtasks.items():
-            updated_progress[milestone][subtask] = st.checkbox(
-                subtask,
-                value=completed,
-                key=f"{milestone}_{subtask}",
-            )
+            for subtask, completed in subtasks.items():
+                updated_progress[milestone][subtask] = st.checkbox(
+                    subtask,
+                    value=completed,
+                    key=f"{milestone}_{subtask}",
+                )
 
     if updated_progress != st.session_state.progress:
-        st.session_state.progress = updated_progress
-        progress_manager.save_progress(
-            st.session_state.goal_id,
-            execution_matrix=updated_progress,
-            computed_progress=compute_progress(updated_progress),
-        )
+        with profiling.action("save_progress"):
+            previous_progress = st.session_state.progress
+            st.session_state.progress = updated_progress
+            progress_manager.save_progress(
+                st.session_state.goal_id,
+                execution_matrix=updated_progress,
+                computed_progress=compute_progress(updated_progress),
+                goal=st.session_state.goal,
+                constraints=st.session_state.constraints,
+            )
+            # Pre-generate the adapted plan when progress crosses a threshold.
+            speculation.on_progress_saved(st.session_state, previous_progress)
         st.success("Progress updated.")
 
 
@@ -301,22 +427,44 @@ is achieved within the stated deadline"
 
 """
 st.markdown("---")
+if st.session_state.plan_generated and speculation.ready(st.session_state):
+    st.caption("⚡ Your adapted plan is ready.")
+
 if st.session_state.plan_generated and st.button("🔄 Adapt Plan and Get Advice on My Progress", type="primary"):
-    with st.spinner("🧠Re-evaluating your progress against your planned goal and constraints..."):
-        adapted_plan = generate_detailed_plan(
+    with profiling.action("adapt_plan"):
+        # Served instantly when a background adaptation matches current progress.
+        st.session_state.adapt_job = speculation.claim(st.session_state) or submit_plan_job(
             goal=st.session_state.goal,
             milestones=st.session_state.milestones,
             constraints=st.session_state.constraints,
             progress=compute_progress(st.session_state.progress),
             subtasks=summarize_subtasks(st.session_state.progress),
         )
+        st.query_params["adapt_job"] = st.session_state.adapt_job
 
-    st.session_state.detailed_plan = adapted_plan
-    st.session_state.adapted = True
+if st.session_state.plan_generated and st.session_state.adapt_job:
+    job = poll_job("adapt_job", "🧠Re-evaluating your progress against your planned goal and constraints...")
 
-    st.success("✅ Evaluation successful.")
+    if job and job["status"] != job_queue.DONE:
+        st.error(job["error"])
+
+    elif job:
+        store_session_blob("detailed_plan_ref", job["result"].encode("utf-8"))
+        st.session_state.adapted = True
+        plan_store.save_version(
+            st.session_state.goal_id,
+            job["result"],
+            "adapted",
+            progress=job["params"]["llm"]["progress"],
+            job_id=job["id"],
+        )
+
+        st.success("✅ Evaluation successful.")
+        show_job_timings(job)
+
+if st.session_state.plan_generated and st.session_state.adapted:
     st.subheader("🔁 Here is what your progress means....")
-    st.write(st.session_state.detailed_plan)
+    st.write(session_plan_text("detailed_plan_ref", "adapted"))
 
 
 
@@ -329,7 +477,9 @@ if st.session_state.plan_generated and st.session_state.show_execution:
     st.markdown("---")
     st.subheader("📊 Milestone Progress Overview")
     st.caption(f"👀Track how far you are close to achieving your {goal_type} goal.")
-    st.table(compute_progress(st.session_state.progress))
+    with profiling.section("compute_progress"):
+        computed_overview = compute_progress(st.session_state.progress)
+    st.table(computed_overview)
 
 # ------------------------------
 # Start New Goal
@@ -341,9 +491,14 @@ System reset logic for users to enter a fresh goal
 if st.session_state.plan_generated:
     st.markdown("---")
     if st.button("🆕 Start New Goal", type="primary"):
-        for key, value in defaults.items():
-            st.session_state[key] = value
-        st.rerun()
+        with profiling.action("start_new_goal"):
+            if st.session_state.speculative_job:
+                job_queue.cancel(st.session_state.speculative_job)
+            blobs.release(st.session_state.session_key)
+            for key, value in defaults.items():
+                st.session_state[key] = value
+            st.query_params.clear()
+            st.rerun()
 
 
 
@@ -362,3 +517,5 @@ st.markdown(
     """,
     unsafe_allow_html=True,
 )
+
+profiling.finish_run()
@@ -1,6 +1,30 @@
 # config.py
+import os
+
 GEMINI_API_KEY = "YOUR_GEMINI_API_KEY"
 OPIK_API_KEY = "YOUR_OPIK_API_KEY"
 
 DEFAULT_HOURS_PER_DAY = 2
 DEFAULT_SKILL_LEVEL = "Intermediate"
+
+# Headless API (api.py)
+API_WORKER_THREADS = int(os.getenv("ACHIEVIT_API_WORKER_THREADS", "8"))
+API_MAX_CONCURRENT_LLM_CALLS = int(os.getenv("ACHIEVIT_API_MAX_CONCURRENT_LLM_CALLS", "32"))
+
+# LLM provider: "auto" (Gemini with offline fallback), "gemini" or "local"
+LLM_PROVIDER = os.getenv("ACHIEVIT_LLM_PROVIDER", "auto")
+LLM_TIMEOUT_SECONDS = float(os.getenv("ACHIEVIT_LLM_TIMEOUT_SECONDS", "120"))
+# "auto" switches to the offline planner if Gemini streams nothing this quickly
+LLM_FIRST_OUTPUT_SECONDS = float(os.getenv("ACHIEVIT_LLM_FIRST_OUTPUT_SECONDS", "15"))
+FALLBACK_MAX_ERRORS = int(os.getenv("ACHIEVIT_FALLBACK_MAX_ERRORS", "2"))
+FALLBACK_SLOW_CALL_SECONDS = float(os.getenv("ACHIEVIT_FALLBACK_SLOW_CALL_SECONDS", "90"))
+FALLBACK_COOLDOWN_SECONDS = float(os.getenv("ACHIEVIT_FALLBACK_COOLDOWN_SECONDS", "300"))
+
+# Speculative adaptation (pre-generating "Adapt Plan" after progress milestones)
+SPECULATION_ENABLED = os.getenv("ACHIEVIT_SPECULATION", "1") == "1"
+SPECULATION_PROGRESS_STEP = int(os.getenv("ACHIEVIT_SPECULATION_PROGRESS_STEP", "25"))
+SPECULATION_MAX_PER_GOAL = int(os.getenv("ACHIEVIT_SPECULATION_MAX_PER_GOAL", "4"))
+SPECULATION_MAX_PER_HOUR = int(os.getenv("ACHIEVIT_SPECULATION_MAX_PER_HOUR", "60"))
+SPECULATION_MAX_BACKLOG = int(os.getenv("ACHIEVIT_SPECULATION_MAX_BACKLOG", "2"))
+
+
@@ -0,0 +1,13 @@
+"""
+Profiling entrypoint for the Streamlit app.
+
+    ACHIEVIT_PROFILE=1 streamlit run profile_app.py
+
+Runs app.py unchanged, closing each profiled rerun in a finally block so
+runs ended by st.rerun(), st.stop() or an error are still written out.
+"""
+import os
+
+from utils import profiling
+
+profiling.run(os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py"))
@@ -0,0 +1,13 @@
+import os
+import tempfile
+
+# Stores are configured from the environment at import time, so point them
+# at a scratch directory before any test imports an app module.
+_DATA_DIR = tempfile.mkdtemp(prefix="achievit-tests-")
+
+os.environ["ACHIEVIT_LLM_PROVIDER"] = "local"
+os.environ["ACHIEVIT_PROGRESS_FILE"] = os.path.join(_DATA_DIR, "progress.json")
+os.environ["ACHIEVIT_JOBS_DB"] = os.path.join(_DATA_DIR, "jobs.db")
+os.environ["ACHIEVIT_BLOB_DIR"] = os.path.join(_DATA_DIR, "blobs")
+os.environ["ACHIEVIT_PLANS_DB"] = os.path.join(_DATA_DIR, "plans.db")
+os.environ["ACHIEVIT_PROFILE_DIR"] = os.path.join(_DATA_DIR, "profiles")
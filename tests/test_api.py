@@ -0,0 +1,61 @@
+from datetime import date, timedelta
+from urllib.parse import quote
+
+import pytest
+
+pytest.importorskip("fastapi")
+from fastapi.testclient import TestClient  # noqa: E402
+
+import api  # noqa: E402
+
+DOCX_MAGIC = b"PK"
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(api.app) as client:
+        yield client
+
+
+def _create(client, goal):
+    response = client.post(
+        "/plans",
+        json={"goal": goal, "deadline": str(date.today() + timedelta(days=30))},
+    )
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+@pytest.mark.parametrize("goal", [
+    "Pass my statistics exam with a distinction",
+    "Pass my exam / with slash and ? and # and % in it",
+])
+def test_goal_endpoints_round_trip(client, goal):
+    plan = _create(client, goal)
+    path = quote(plan["goal_id"], safe="")
+    milestone, subtasks = next(iter(plan["execution"].items()))
+    subtask = next(iter(subtasks))
+
+    assert client.get(f"/progress/{path}").json()["goal_id"] == plan["goal_id"]
+
+    patched = client.patch(f"/progress/{path}", json={"execution": {milestone: {subtask: True}}})
+    assert patched.status_code == 200
+    assert patched.json()["execution"][milestone][subtask] is True
+
+    adapted = client.post(f"/plans/{path}/adapt")
+    assert adapted.status_code == 200
+    assert adapted.json()["version"] == plan["version"] + 1
+
+    versions = client.get(f"/plans/{path}/versions").json()["versions"]
+    assert [v["kind"] for v in versions][-2:] == ["roadmap", "adapted"]
+    assert client.get(f"/plans/{path}/versions/{plan['version']}").json()["text"] == plan["plan"]
+
+    export = client.post(f"/plans/{path}/export", json={})
+    assert export.status_code == 200
+    assert export.headers["content-type"] == api.DOCX_MIME
+    assert export.content.startswith(DOCX_MAGIC)
+
+
+def test_unknown_goal_is_404(client):
+    assert client.get("/progress/no_such_goal").status_code == 404
+    assert client.post("/plans/no_such_goal/export", json={}).status_code == 404
@@ -0,0 +1,80 @@
+import os
+import time
+from datetime import date, timedelta
+
+import pytest
+
+pytest.importorskip("streamlit")
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from utils import plan_store  # noqa: E402
+from utils.blob_store import blobs  # noqa: E402
+
+APP_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+GOAL = "Pass my statistics exam with a distinction grade"
+
+
+def _button(at, prefix):
+    return next(button for button in at.button if button.label.startswith(prefix))
+
+
+def _wait_for(at, text, timeout=30):
+    deadline = time.monotonic() + timeout
+    while not any(text in h.value for h in at.subheader):
+        assert not at.exception, at.exception
+        assert time.monotonic() < deadline, f"timed out waiting for {text!r}"
+        time.sleep(0.1)
+        at.run()
+
+
+def _app():
+    return AppTest.from_file(APP_FILE, default_timeout=30)
+
+
+def _roadmap(goal=GOAL):
+    at = _app().run()
+    at.sidebar.text_area[0].input(goal)
+    at.sidebar.date_input[0].set_value(date.today() + timedelta(days=30))
+    _button(at, "🚀").click().run()
+    _wait_for(at, "Road Map")
+    return at
+
+
+def test_roadmap_download_is_built_on_click():
+    at = _roadmap()
+
+    assert len(at.get("download_button")) == 1
+    assert not at.exception
+
+
+def test_missing_plan_blob_is_reloaded_from_plan_store():
+    at = _roadmap(f"{GOAL} after the blob was dropped")
+    ref = at.session_state.detailed_plan_original_ref
+    blobs.release(at.session_state.session_key)
+    assert not os.path.exists(blobs._path(ref))
+
+    at.run()
+
+    assert not at.exception
+    assert any("Road Map" in h.value for h in at.subheader)
+    assert os.path.exists(blobs._path(at.session_state.detailed_plan_original_ref))
+
+
+def test_refresh_restoring_jobs_adds_no_plan_versions():
+    at = _roadmap(f"{GOAL} and refresh the page")
+    _button(at, "▶️").click().run()
+    at.checkbox[0].check().run()
+    _button(at, "🔄").click().run()
+    _wait_for(at, "what your progress means")
+
+    goal_id = at.session_state.goal_id
+    query = {key: at.query_params[key] for key in ("roadmap_job", "adapt_job")}
+    assert [v["kind"] for v in plan_store.list_versions(goal_id)] == ["roadmap", "adapted"]
+
+    for _ in range(2):
+        refreshed = _app()
+        refreshed.query_params.update(query)
+        refreshed.run()
+        _wait_for(refreshed, "what your progress means")
+
+    assert [v["kind"] for v in plan_store.list_versions(goal_id)] == ["roadmap", "adapted"]
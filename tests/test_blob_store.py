@@ -0,0 +1,92 @@
+import os
+
+import pytest
+
+from utils import blob_store
+from utils.blob_store import BlobStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BlobStore(root=str(tmp_path / "blobs"), memory_budget=1024)
+
+
+def _exists(store, ref):
+    return os.path.exists(store._path(ref))
+
+
+def test_identical_content_is_stored_once(store):
+    a = store.put(b"same plan", "s1")
+    b = store.put_text("same plan", "s2")
+
+    assert a == b
+    assert store.get_text(a) == "same plan"
+    assert store.stats()["referenced_blobs"] == 1
+
+
+def test_blob_deleted_when_last_reference_released(store):
+    ref = store.put(b"shared", "s1")
+    store.put(b"shared", "s2")
+
+    store.release("s1")
+    assert _exists(store, ref)
+    assert store.get(ref) == b"shared"
+
+    store.release("s2")
+    assert not _exists(store, ref)
+    with pytest.raises(FileNotFoundError):
+        store.get(ref)
+
+
+def test_untrack_drops_a_single_reference(store):
+    old = store.put(b"old plan", "s1")
+    new = store.put(b"new plan", "s1")
+
+    store.untrack("s1", old)
+
+    assert not _exists(store, old)
+    assert _exists(store, new)
+    assert store.session_bytes("s1") == len(b"new plan")
+
+
+def test_cache_respects_memory_budget(store):
+    refs = [store.put(bytes([i]) * 400, "s1") for i in range(5)]
+
+    assert store.stats()["cache_bytes"] <= 1024
+    assert store.get(refs[0]) == bytes([0]) * 400
+
+
+def test_idle_sessions_are_released(store, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(blob_store.time, "time", lambda: now[0])
+    ref = store.put(b"idle plan", "idle")
+
+    now[0] += blob_store.SESSION_IDLE_SECONDS + 1
+    store.put(b"other plan", "other")
+
+    assert not _exists(store, ref)
+
+
+def test_reading_keeps_a_session_alive(store, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(blob_store.time, "time", lambda: now[0])
+    ref = store.put(b"active plan", "active")
+
+    for _ in range(3):
+        now[0] += blob_store.SESSION_IDLE_SECONDS / 2
+        assert store.get_text(ref, "active") == "active plan"
+    store.put(b"other plan", "other")
+
+    assert _exists(store, ref)
+
+
+def test_sweep_removes_only_old_unreferenced_files(store):
+    kept = store.put(b"referenced", "s1")
+    orphan = store.put(b"orphan")
+    old = os.path.getmtime(store._path(orphan)) - blob_store.ORPHAN_MAX_AGE_SECONDS - 1
+    os.utime(store._path(orphan), (old, old))
+    os.utime(store._path(kept), (old, old))
+
+    assert store.sweep() == 1
+    assert _exists(store, kept)
+    assert not _exists(store, orphan)
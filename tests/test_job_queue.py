@@ -0,0 +1,208 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from utils import job_queue
+
+gates = {}
+
+
+@job_queue.register("test_echo")
+def _echo(params, report):
+    report("partial")
+    return params["text"]
+
+
+@job_queue.register("test_gated")
+def _gated(params, report):
+    """
+    Reports once, then waits for the test to open its gate.
+    """
+    gate = gates[params["gate"]]
+    report("started")
+    gate["started"].set()
+    gate["release"].wait(5)
+    if params.get("report_again"):
+        report("more")
+    return "finished"
+
+
+@job_queue.register("test_fails")
+def _fails(params, report):
+    raise job_queue.JobError("nope")
+
+
+def _gate(name):
+    gates[name] = {"started": threading.Event(), "release": threading.Event()}
+    return gates[name]
+
+
+def _wait(job_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = job_queue.get(job_id)
+        if job["status"] in job_queue.FINISHED:
+            return job
+        assert time.monotonic() < deadline, f"job still {job['status']}"
+        time.sleep(0.01)
+
+
+def _idle():
+    deadline = time.monotonic() + 5
+    while job_queue._interactive_running or job_queue.speculative_backlog():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+@pytest.fixture(autouse=True)
+def settle():
+    yield
+    for gate in gates.values():
+        gate["release"].set()
+    _idle()
+
+
+def test_job_runs_to_done_with_timings():
+    job = _wait(job_queue.submit("test_echo", {"text": "hello"}))
+
+    assert job["status"] == job_queue.DONE
+    assert job["result"] == "hello"
+    assert job["timings"]["run_s"] is not None
+
+
+def test_job_error_fails_with_message():
+    job = _wait(job_queue.submit("test_fails", {}))
+
+    assert (job["status"], job["error"]) == (job_queue.FAILED, "nope")
+
+
+def test_unknown_kind_is_rejected():
+    with pytest.raises(ValueError):
+        job_queue.submit("test_missing", {})
+
+
+def test_cancel_stops_a_running_job():
+    gate = _gate("cancel")
+    job_id = job_queue.submit("test_gated", {"gate": "cancel", "report_again": True})
+    assert gate["started"].wait(5)
+
+    assert job_queue.cancel(job_id, reason="user")
+    gate["release"].set()
+
+    job = _wait(job_id)
+    assert (job["status"], job["error"]) == (job_queue.CANCELLED, "user")
+
+
+def test_cancel_after_last_report_is_not_overwritten_by_done():
+    gate = _gate("race")
+    job_id = job_queue.submit("test_gated", {"gate": "race"})
+    assert gate["started"].wait(5)
+
+    # Cancelled in the database only (as another process would), and the
+    # runner returns without another report(), so only the conditional
+    # final update keeps the cancellation.
+    job_queue._update(job_id, status=job_queue.CANCELLED)
+    gate["release"].set()
+
+    assert _wait(job_id)["status"] == job_queue.CANCELLED
+
+
+def test_cancel_of_finished_job_is_a_no_op():
+    job_id = job_queue.submit("test_echo", {"text": "done"})
+    _wait(job_id)
+
+    assert not job_queue.cancel(job_id)
+    assert job_queue.get(job_id)["status"] == job_queue.DONE
+
+
+def test_failed_status_write_releases_interactive_count(monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(job_queue, "_transition", broken)
+    job_queue.submit("test_echo", {"text": "x"})
+
+    _idle()
+
+
+def test_interactive_submit_cancels_running_speculation():
+    gate = _gate("speculative")
+    speculative_id = job_queue.submit("test_gated", {"gate": "speculative", "report_again": True}, speculative=True)
+    assert gate["started"].wait(5)
+
+    interactive_id = job_queue.submit("test_echo", {"text": "now"})
+    gate["release"].set()
+
+    assert _wait(speculative_id)["status"] == job_queue.CANCELLED
+    assert _wait(interactive_id)["status"] == job_queue.DONE
+
+
+def test_adopted_speculation_is_not_cancelled():
+    gate = _gate("adopted")
+    speculative_id = job_queue.submit("test_gated", {"gate": "adopted", "report_again": True}, speculative=True)
+    assert gate["started"].wait(5)
+
+    assert job_queue.adopt(speculative_id)
+    job_queue.submit("test_echo", {"text": "now"})
+    gate["release"].set()
+
+    assert _wait(speculative_id)["status"] == job_queue.DONE
+
+
+def test_speculation_is_deferred_while_interactive_work_is_queued():
+    gate = _gate("interactive")
+    interactive_id = job_queue.submit("test_gated", {"gate": "interactive"})
+    assert gate["started"].wait(5)
+
+    speculative_id = job_queue.submit("test_echo", {"text": "later"}, speculative=True)
+    job = _wait(speculative_id)
+    gate["release"].set()
+
+    assert job["status"] == job_queue.CANCELLED
+    assert job["error"].startswith("Deferred")
+    assert _wait(interactive_id)["status"] == job_queue.DONE
+
+
+def _insert(job_id, status, owner_pid=None, finished_at=None):
+    with job_queue._connect() as conn:
+        conn.execute(
+            "INSERT INTO jobs (id, kind, status, params, created_at, finished_at, owner_pid) "
+            "VALUES (?, 'test_echo', ?, '{}', ?, ?, ?)",
+            (job_id, status, time.time(), finished_at, owner_pid),
+        )
+
+
+def test_startup_fails_only_jobs_of_exited_processes():
+    exited = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited.wait()
+    job_queue.get("warm-up")
+    _insert("orphaned", job_queue.RUNNING, owner_pid=exited.pid)
+    _insert("legacy", job_queue.QUEUED)
+    _insert("other-process", job_queue.RUNNING, owner_pid=os.getppid())
+
+    job_queue._init_db()
+
+    assert job_queue.get("orphaned")["status"] == job_queue.FAILED
+    assert job_queue.get("legacy")["status"] == job_queue.FAILED
+    assert job_queue.get("other-process")["status"] == job_queue.RUNNING
+    job_queue._update("other-process", status=job_queue.CANCELLED, finished_at=time.time())
+
+
+def test_prune_removes_only_old_finished_jobs():
+    old = time.time() - job_queue.RETENTION_SECONDS - 60
+    job_queue.get("warm-up")
+    _insert("old-done", job_queue.DONE, finished_at=old)
+    _insert("old-but-running", job_queue.RUNNING, owner_pid=os.getpid())
+    recent = job_queue.submit("test_echo", {"text": "keep"})
+    _wait(recent)
+
+    assert job_queue.prune() >= 1
+
+    assert job_queue.get("old-done") is None
+    assert job_queue.get("old-but-running") is not None
+    assert job_queue.get(recent) is not None
+    job_queue._update("old-but-running", status=job_queue.CANCELLED, finished_at=time.time())
@@ -0,0 +1,15 @@
+import pytest
+
+from tools.loadtest_api import percentile
+
+
+@pytest.mark.parametrize("samples, pct, expected", [
+    ([1, 2, 3, 4, 5], 50, 3),
+    (list(range(1, 22)), 50, 11),
+    (list(range(1, 101)), 95, 95),
+    (list(range(1, 101)), 99, 99),
+    ([7], 99, 7),
+    ([], 50, 0.0),
+])
+def test_percentile_is_nearest_rank(samples, pct, expected):
+    assert percentile(samples, pct) == expected
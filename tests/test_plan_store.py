@@ -0,0 +1,96 @@
+import threading
+
+import pytest
+
+from utils import plan_store
+
+
+@pytest.fixture(autouse=True)
+def plans_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(plan_store, "PLANS_DB", str(tmp_path / "plans.db"))
+    plan_store._text_for_hash.cache_clear()
+
+
+def _plan(i):
+    lines = [f"Milestone {m}: revise chapter {m} and practise past papers." for m in range(40)]
+    lines[i % 40] = f"Adapted line {i}: focus on weak topics first."
+    return "\n".join(lines)
+
+
+def test_versions_are_numbered_and_loaded():
+    assert plan_store.save_version("g", _plan(0), "roadmap") == 1
+    assert plan_store.save_version("g", _plan(1), "adapted", progress={"M": 50}) == 2
+
+    assert [(v["version"], v["kind"]) for v in plan_store.list_versions("g")] == [(1, "roadmap"), (2, "adapted")]
+    assert plan_store.load_version("g", 1)["text"] == _plan(0)
+    latest = plan_store.load_version("g")
+    assert (latest["version"], latest["progress"], latest["text"]) == (2, {"M": 50}, _plan(1))
+    assert plan_store.load_version("g", 3) is None
+
+
+def test_same_text_as_latest_is_not_a_new_version():
+    plan_store.save_version("g", _plan(0), "roadmap")
+
+    assert plan_store.save_version("g", _plan(0), "adapted") == 1
+    assert len(plan_store.list_versions("g")) == 1
+
+
+def test_identical_texts_share_one_blob():
+    plan_store.save_version("a", _plan(0), "roadmap")
+    plan_store.save_version("b", _plan(0), "roadmap")
+
+    assert plan_store.stats()["blobs"] == 1
+    assert plan_store.stats()["versions"] == 2
+
+
+def test_delta_chain_is_capped_and_round_trips():
+    texts = [_plan(i) for i in range(plan_store.MAX_CHAIN_DEPTH * 2 + 3)]
+    for text in texts:
+        plan_store.save_version("g", text, "adapted")
+    plan_store._text_for_hash.cache_clear()
+
+    with plan_store._connect() as conn:
+        depths = [row["depth"] for row in conn.execute("SELECT depth FROM plan_blobs ORDER BY rowid")]
+    assert max(depths) == plan_store.MAX_CHAIN_DEPTH
+    assert depths.count(0) == 3
+    assert [plan_store.load_version("g", i + 1)["text"] for i in range(len(texts))] == texts
+
+    stats = plan_store.stats()
+    assert stats["stored_bytes"] < stats["raw_bytes"] / 5
+
+
+def test_saving_a_job_again_returns_its_version():
+    first = plan_store.save_version("g", _plan(0), "roadmap", job_id="job-1")
+    plan_store.save_version("g", _plan(1), "adapted", job_id="job-2")
+
+    assert plan_store.save_version("g", _plan(0), "roadmap", job_id="job-1") == first
+    assert len(plan_store.list_versions("g")) == 2
+
+
+def test_concurrent_saves_get_distinct_versions():
+    errors = []
+
+    def save(i):
+        try:
+            plan_store.save_version("g", _plan(i), "adapted")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=save, args=(i,)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert [v["version"] for v in plan_store.list_versions("g")] == list(range(1, 21))
+
+
+def test_diff_versions():
+    plan_store.save_version("g", "a\nb", "roadmap")
+    plan_store.save_version("g", "a\nc", "adapted")
+
+    diff = plan_store.diff_versions("g", 1, 2)
+    assert "-b" in diff and "+c" in diff
+    with pytest.raises(KeyError):
+        plan_store.diff_versions("g", 1, 9)
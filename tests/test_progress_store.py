@@ -0,0 +1,178 @@
+import json
+import tracemalloc
+
+import pytest
+
+from utils import progress_store
+
+
+def _record(i):
+    return {
+        "execution": {"Milestone": {"Subtask a": bool(i % 2), "Subtask b": False}},
+        "computed": {"Milestone": 50 if i % 2 else 0},
+        "last_updated": "2026-01-01T00:00:00",
+    }
+
+
+@pytest.fixture
+def progress_file(tmp_path):
+    data = {
+        "plain_goal": _record(1),
+        'quote " and \\\\ backslash': _record(2),
+        "brace } and , comma: inside": _record(3),
+        "unicode_é_目標_ ": _record(4),
+        "escaped_\\u0041": _record(5),
+    }
+    data.update({f"goal_{i:03d}": _record(i) for i in range(40)})
+    path = tmp_path / "progress.json"
+    path.write_text(json.dumps(data, indent=4))
+    return path, data
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 64, 65536])
+def test_json_stream_matches_json_load(progress_file, monkeypatch, chunk_size):
+    path, data = progress_file
+    monkeypatch.setattr(progress_store, "READ_CHUNK_SIZE", chunk_size)
+
+    records = list(progress_store.JsonProgressStore(str(path)).iter_records())
+
+    assert dict(records) == data
+    assert [key for key, _ in records] == list(data)
+
+
+def test_json_stream_empty_object(tmp_path, monkeypatch):
+    monkeypatch.setattr(progress_store, "READ_CHUNK_SIZE", 1)
+    path = tmp_path / "progress.json"
+    path.write_text(" { \n } ")
+
+    assert list(progress_store.JsonProgressStore(str(path)).iter_records()) == []
+
+
+def test_export_import_roundtrip_and_verify(progress_file, tmp_path):
+    path, data = progress_file
+    src = progress_store.JsonProgressStore(str(path))
+    export = tmp_path / "backup.jsonl"
+    with open(export, "w") as out:
+        manifest = progress_store.export_jsonl(src, out)
+
+    dst = progress_store.SqliteProgressStore(str(tmp_path / "progress.db"))
+    assert progress_store.import_jsonl(str(export), dst, batch_size=7) == len(data)
+    assert manifest["count"] == len(data)
+    progress_store.verify(src, dst)
+    progress_store.verify(dst, src)
+
+
+def test_truncated_export_is_rejected_before_writing(progress_file, tmp_path):
+    path, _ = progress_file
+    export = tmp_path / "backup.jsonl"
+    with open(export, "w") as out:
+        progress_store.export_jsonl(progress_store.JsonProgressStore(str(path)), out)
+    truncated = tmp_path / "truncated.jsonl"
+    truncated.write_text("".join(export.read_text().splitlines(keepends=True)[:10]))
+
+    dst = progress_store.SqliteProgressStore(str(tmp_path / "progress.db"))
+    with pytest.raises(progress_store.IntegrityError, match="Missing manifest"):
+        progress_store.import_jsonl(str(truncated), dst)
+    assert list(dst.iter_records()) == []
+
+
+def test_missing_checksum_requires_no_verify(tmp_path):
+    hand_written = tmp_path / "hand.jsonl"
+    hand_written.write_text(json.dumps({"goal_id": "g", "record": _record(1)}) + "\n")
+    dst = progress_store.SqliteProgressStore(str(tmp_path / "progress.db"))
+
+    with pytest.raises(progress_store.IntegrityError, match="Missing checksum"):
+        progress_store.import_jsonl(str(hand_written), dst)
+
+    assert progress_store.import_jsonl(str(hand_written), dst, verify=False) == 1
+    assert dst.get("g") == _record(1)
+
+
+def test_interrupted_sqlite_import_resumes(progress_file, tmp_path, monkeypatch):
+    path, data = progress_file
+    export = tmp_path / "backup.jsonl"
+    with open(export, "w") as out:
+        progress_store.export_jsonl(progress_store.JsonProgressStore(str(path)), out)
+
+    dst = progress_store.SqliteProgressStore(str(tmp_path / "progress.db"))
+    write_batch = progress_store._SqliteBatchWriter.write_batch
+    positions = []
+
+    def interrupted(self, records, position):
+        if len(positions) == 2:
+            raise KeyboardInterrupt
+        positions.append(position)
+        write_batch(self, records, position)
+
+    monkeypatch.setattr(progress_store._SqliteBatchWriter, "write_batch", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        progress_store.import_jsonl(str(export), dst, batch_size=10)
+    assert len(list(dst.iter_records())) == 20
+
+    resumed = []
+
+    def recording(self, records, position):
+        resumed.append(records[0][0])
+        write_batch(self, records, position)
+
+    monkeypatch.setattr(progress_store._SqliteBatchWriter, "write_batch", recording)
+    progress_store.import_jsonl(str(export), dst, batch_size=10)
+
+    assert len(resumed) == 3
+    assert dict(dst.iter_records()) == data
+
+
+def test_verify_detects_changed_and_missing_records(progress_file, tmp_path):
+    path, data = progress_file
+    src = progress_store.JsonProgressStore(str(path))
+
+    changed = dict(data, plain_goal=_record(2))
+    changed_path = tmp_path / "changed.json"
+    changed_path.write_text(json.dumps(changed))
+    with pytest.raises(progress_store.IntegrityError, match="plain_goal"):
+        progress_store.verify(src, progress_store.JsonProgressStore(str(changed_path)))
+
+    dst = progress_store.SqliteProgressStore(str(tmp_path / "progress.db"))
+    progress_store.migrate(src, dst)
+    with pytest.raises(progress_store.IntegrityError):
+        progress_store.verify(progress_store.JsonProgressStore(str(changed_path)), dst)
+
+
+def test_json_import_merges_with_existing(progress_file, tmp_path):
+    path, data = progress_file
+    target = tmp_path / "target.json"
+    target.write_text(json.dumps({"existing": _record(9), "plain_goal": _record(0)}, indent=4))
+
+    progress_store.migrate(
+        progress_store.JsonProgressStore(str(path)),
+        progress_store.JsonProgressStore(str(target)),
+    )
+
+    merged = json.loads(target.read_text())
+    assert merged == {**data, "existing": _record(9)}
+
+
+def test_json_import_rejects_duplicate_ids(tmp_path):
+    target = progress_store.JsonProgressStore(str(tmp_path / "target.json"))
+
+    with pytest.raises(progress_store.IntegrityError, match="Duplicate"):
+        with target.bulk_writer() as writer:
+            writer.write_batch([("g", _record(1)), ("g", _record(2))], 0)
+    assert list(target.iter_records()) == []
+
+
+def test_json_import_memory_does_not_grow_with_records(tmp_path):
+    def peak_for(n):
+        records = ((f"goal_{i:06d}_{'x' * 40}", _record(i)) for i in range(n))
+        target = progress_store.JsonProgressStore(str(tmp_path / f"target_{n}.json"))
+
+        tracemalloc.start()
+        with target.bulk_writer() as writer:
+            for batch in progress_store._batched(records, 500):
+                writer.write_batch(batch, 0)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak
+
+    # One batch dominates the footprint; written ids must not accumulate.
+    assert peak_for(10000) < peak_for(1000) * 1.5
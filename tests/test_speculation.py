@@ -0,0 +1,137 @@
+import threading
+import time
+
+import pytest
+
+from agents import plan_jobs, speculation
+from utils import job_queue
+
+MILESTONES = ["Revise", "Practise"]
+release = threading.Event()
+
+
+def _matrix(done):
+    """
+    Two milestones of two subtasks, the first `done` ticked in order.
+    """
+    ticks = iter([True] * done + [False] * (4 - done))
+    return {m: {f"{m} {i}": next(ticks) for i in range(2)} for m in MILESTONES}
+
+
+def _state(goal_id, done):
+    return {
+        "goal": f"Goal {goal_id}",
+        "goal_id": goal_id,
+        "constraints": {"hours_per_day": 2},
+        "milestones": MILESTONES,
+        "progress": _matrix(done),
+        "speculative_job": None,
+        "speculative_fingerprint": None,
+    }
+
+
+def _save(state, done):
+    previous = state["progress"]
+    state["progress"] = _matrix(done)
+    speculation.on_progress_saved(state, previous)
+
+
+def _wait(job_id, statuses):
+    deadline = time.monotonic() + 5
+    while job_queue.get(job_id)["status"] not in statuses:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+@pytest.fixture(autouse=True)
+def speculating(monkeypatch):
+    def fake_stream(**plan):
+        yield "adapted "
+        release.wait(5)
+        yield "plan"
+
+    release.clear()
+    monkeypatch.setattr(plan_jobs, "stream_detailed_plan", fake_stream)
+    monkeypatch.setattr(speculation, "SPECULATION_ENABLED", True)
+    monkeypatch.setattr(speculation, "SPECULATION_PROGRESS_STEP", 25)
+    monkeypatch.setattr(speculation, "_llm_worth_speculating", lambda: True)
+    monkeypatch.setattr(speculation, "_goal_starts", {})
+    monkeypatch.setattr(speculation, "_recent_starts", speculation.deque())
+    yield
+    release.set()
+    deadline = time.monotonic() + 5
+    while job_queue.speculative_backlog():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_crossed_threshold():
+    assert not speculation.crossed_threshold(_matrix(0), _matrix(0))
+    # 1 of 4 subtasks: overall 25%, a new band.
+    assert speculation.crossed_threshold(_matrix(0), _matrix(1))
+    # First milestone completes.
+    assert speculation.crossed_threshold(_matrix(1), _matrix(2))
+    assert not speculation.crossed_threshold(_matrix(2), _matrix(2))
+
+
+def test_fingerprint_tracks_progress():
+    assert speculation.fingerprint("g", {}, _matrix(1)) == speculation.fingerprint("g", {}, _matrix(1))
+    assert speculation.fingerprint("g", {}, _matrix(1)) != speculation.fingerprint("g", {}, _matrix(2))
+
+
+def test_no_speculation_below_threshold():
+    state = _state("below", 0)
+    _save(state, 0)
+
+    assert state["speculative_job"] is None
+
+
+def test_claim_adopts_matching_job_and_serves_result():
+    state = _state("claim", 0)
+    _save(state, 1)
+    job_id = state["speculative_job"]
+    _wait(job_id, (job_queue.RUNNING,))
+
+    assert speculation.claim(state) == job_id
+    assert state["speculative_job"] is None
+
+    # An interactive submit no longer cancels an adopted job.
+    plan_jobs.submit_plan_job("other", [], {}, {}, {})
+    release.set()
+    _wait(job_id, job_queue.FINISHED)
+    assert job_queue.get(job_id)["status"] == job_queue.DONE
+
+
+def test_claim_cancels_job_for_stale_progress():
+    state = _state("stale", 0)
+    _save(state, 1)
+    job_id = state["speculative_job"]
+    state["progress"] = _matrix(0)
+
+    assert speculation.claim(state) is None
+    _wait(job_id, (job_queue.CANCELLED,))
+
+
+def test_ready_once_matching_job_is_done():
+    state = _state("ready", 0)
+    _save(state, 1)
+    assert not speculation.ready(state)
+
+    release.set()
+    _wait(state["speculative_job"], job_queue.FINISHED)
+    assert speculation.ready(state)
+
+
+def test_per_goal_cap_survives_a_refresh(monkeypatch):
+    monkeypatch.setattr(speculation, "SPECULATION_MAX_PER_GOAL", 1)
+    release.set()
+    state = _state("capped", 0)
+    _save(state, 1)
+    assert state["speculative_job"]
+    _wait(state["speculative_job"], job_queue.FINISHED)
+
+    # A refreshed session starts from fresh session state.
+    refreshed = _state("capped", 1)
+    _save(refreshed, 2)
+
+    assert refreshed["speculative_job"] is None
@@ -0,0 +1,101 @@
+"""
+Local stand-in for the Gemini generateContent endpoint.
+
+Used by load tests so no quota is spent and latency/error behaviour can be
+dialled in. Point the app or API at it with GEMINI_BASE_URL.
+
+Run with:
+    uvicorn tools.fake_llm:app --port 8090
+
+Environment:
+    FAKE_LLM_LATENCY_MS   mean response latency (default 800)
+    FAKE_LLM_JITTER_MS    uniform +/- jitter around the mean (default 200)
+    FAKE_LLM_ERROR_RATE   fraction of requests answered with a 503 (default 0)
+    FAKE_LLM_CHUNKS       number of chunks in streamed responses (default 8)
+"""
+import asyncio
+import json
+import os
+import random
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", "800"))
+JITTER_MS = float(os.getenv("FAKE_LLM_JITTER_MS", "200"))
+ERROR_RATE = float(os.getenv("FAKE_LLM_ERROR_RATE", "0"))
+CHUNKS = int(os.getenv("FAKE_LLM_CHUNKS", "8"))
+
+
+def fake_plan_text(prompt: str) -> str:
+    """
+    Produce a plan-shaped response that scales with the prompt size.
+    """
+    lines = [line.strip() for line in prompt.splitlines() if line.strip()]
+    body = [f"## Step {i + 1}\n{line}" for i, line in enumerate(lines[:40])]
+    return "\n\n".join(["# Adaptive Plan (fake LLM)", *body])
+
+
+def sample_latency() -> float:
+    """
+    Latency in seconds, drawn from the configured mean and jitter.
+    """
+    return max(0.0, LATENCY_MS + random.uniform(-JITTER_MS, JITTER_MS)) / 1000
+
+
+def _candidate(text):
+    return {
+        "candidates": [
+            {
+                "content": {"role": "model", "parts": [{"text": text}]},
+                "finishReason": "STOP",
+                "index": 0,
+            }
+        ],
+        "usageMetadata": {"promptTokenCount": 0, "candidatesTokenCount": len(text.split())},
+    }
+
+
+def _error():
+    return JSONResponse(
+        {"error": {"code": 503, "message": "The model is overloaded (fake).", "status": "UNAVAILABLE"}},
+        status_code=503,
+    )
+
+
+async def _prompt_text(request):
+    payload = await request.json()
+    return "\n".join(
+        part.get("text", "")
+        for content in payload.get("contents", [])
+        for part in content.get("parts", [])
+    )
+
+
+async def model_action(request):
+    _, _, action = request.path_params["model_action"].partition(":")
+    prompt = await _prompt_text(request)
+
+    if random.random() < ERROR_RATE:
+        await asyncio.sleep(sample_latency() / 4)
+        return _error()
+
+    text = fake_plan_text(prompt)
+
+    if action == "streamGenerateContent":
+        async def events():
+            step = max(1, len(text) // CHUNKS)
+            for start in range(0, len(text), step):
+                await asyncio.sleep(sample_latency() / CHUNKS)
+                yield f"data: {json.dumps(_candidate(text[start:start + step]))}\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    await asyncio.sleep(sample_latency())
+    return JSONResponse(_candidate(text))
+
+
+app = Starlette(
+    routes=[Route("/{api_version}/models/{model_action}", model_action, methods=["POST"])]
+)
@@ -0,0 +1,152 @@
+"""
+Load test for the headless API (api.py) against the local fake LLM.
+
+Each virtual user creates a plan, ticks a few subtasks, asks for an adapted
+plan and exports the DOCX. Latencies are reported per endpoint.
+
+Run everything locally in one go:
+    python -m tools.loadtest_api --spawn --users 50 --iterations 4
+
+Or against an already running API:
+    python -m tools.loadtest_api --base-url http://localhost:8000
+"""
+import argparse
+import asyncio
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from urllib.parse import quote
+
+import httpx
+
+
+def percentile(samples, pct):
+    """
+    Nearest-rank percentile of a list of numbers.
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def print_report(latencies, failures, elapsed):
+    print(f"{'interaction':<24}{'n':>7}{'fail':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name in sorted(latencies):
+        samples = [s * 1000 for s in latencies[name]]
+        print(
+            f"{name:<24}{len(samples):>7}{failures[name]:>6}"
+            f"{percentile(samples, 50):>10.1f}{percentile(samples, 95):>10.1f}{percentile(samples, 99):>10.1f}"
+        )
+    total = sum(len(v) for v in latencies.values())
+    print(f"\n{total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s)")
+
+
+async def _timed(client, latencies, failures, name, method, url, **kwargs):
+    start = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+        ok = response.is_success
+    except httpx.HTTPError:
+        response, ok = None, False
+    latencies[name].append(time.perf_counter() - start)
+    if not ok:
+        failures[name] += 1
+    return response if ok else None
+
+
+async def virtual_user(client, user_id, iterations, latencies, failures):
+    deadline = str(date.today() + timedelta(days=30))
+    for i in range(iterations):
+        goal = f"Prepare for my statistics exam load test user {user_id} run {i}"
+        created = await _timed(
+            client, latencies, failures, "create_plan", "POST", "/plans",
+            json={"goal": goal, "deadline": deadline, "hours_per_day": 3},
+        )
+        if created is None:
+            continue
+        plan = created.json()
+        goal_id = quote(plan["goal_id"], safe="")
+
+        for milestone, subtasks in list(plan["execution"].items())[:2]:
+            first = next(iter(subtasks))
+            await _timed(
+                client, latencies, failures, "patch_progress", "PATCH", f"/progress/{goal_id}",
+                json={"execution": {milestone: {first: True}}},
+            )
+        await _timed(client, latencies, failures, "get_progress", "GET", f"/progress/{goal_id}")
+        await _timed(client, latencies, failures, "adapt_plan", "POST", f"/plans/{goal_id}/adapt")
+        await _timed(
+            client, latencies, failures, "export", "POST", f"/plans/{goal_id}/export",
+            json={},
+        )
+
+
+async def run(base_url, users, iterations):
+    latencies, failures = defaultdict(list), defaultdict(int)
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(virtual_user(client, u, iterations, latencies, failures) for u in range(users))
+        )
+        elapsed = time.perf_counter() - start
+    print_report(latencies, failures, elapsed)
+
+
+def _spawn(module, port, env):
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", module, "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+
+
+def _wait_until_up(url, timeout=30):
+    start = time.time()
+    while time.time() - start < timeout:
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--spawn", action="store_true", help="start the fake LLM and the API locally")
+    parser.add_argument("--llm-port", type=int, default=8090)
+    args = parser.parse_args()
+
+    processes = []
+    try:
+        if args.spawn:
+            env = dict(os.environ)
+            env["GEMINI_API_KEY"] = env.get("GEMINI_API_KEY", "fake-key")
+            env["GEMINI_BASE_URL"] = f"http://127.0.0.1:{args.llm_port}"
+            # Keep load-test goals out of the real progress, plan and profile stores.
+            workdir = tempfile.mkdtemp(prefix="achievit-loadtest-")
+            env["ACHIEVIT_PROGRESS_FILE"] = os.path.join(workdir, "progress.json")
+            env["ACHIEVIT_PLANS_DB"] = os.path.join(workdir, "plans.db")
+            env["ACHIEVIT_PROFILE_DIR"] = os.path.join(workdir, "profiles")
+            processes.append(_spawn("tools.fake_llm:app", args.llm_port, env))
+            processes.append(_spawn("api:app", int(args.base_url.rsplit(":", 1)[-1]), env))
+            _wait_until_up(env["GEMINI_BASE_URL"])
+            _wait_until_up(f"{args.base_url}/docs")
+        asyncio.run(run(args.base_url, args.users, args.iterations))
+    finally:
+        for process in processes:
+            process.terminate()
+
+
+if __name__ == "__main__":
+    main()
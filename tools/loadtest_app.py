@@ -0,0 +1,230 @@
+"""
+Concurrent-session load test for the Streamlit app (app.py).
+
+Drives simulated sessions through the real script with Streamlit's AppTest:
+get roadmap -> reveal tasks -> toggle subtasks -> adapt -> download. Plan
+generation is replaced by a local fake with configurable latency and error
+rate, so no Gemini quota is used. Concurrency is ramped up step by step and
+p50/p95/p99 per interaction are reported for each step, together with the
+first step where throughput stops scaling or p95 latency degrades
+(the saturation point).
+
+    python -m tools.loadtest_app --levels 1,2,4,8,16,32 --latency-ms 800
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+# Isolate every store the app writes to before any app module is imported.
+_WORKDIR = tempfile.mkdtemp(prefix="achievit-loadtest-")
+os.environ.setdefault("GEMINI_API_KEY", "fake-key")
+os.environ["ACHIEVIT_PROGRESS_FILE"] = os.path.join(_WORKDIR, "progress.json")
+os.environ["ACHIEVIT_JOBS_DB"] = os.path.join(_WORKDIR, "jobs.db")
+os.environ["ACHIEVIT_BLOB_DIR"] = os.path.join(_WORKDIR, "blobs")
+os.environ["ACHIEVIT_PLANS_DB"] = os.path.join(_WORKDIR, "plans.db")
+os.environ["ACHIEVIT_PROFILE_DIR"] = os.path.join(_WORKDIR, "profiles")
+
+from google.genai import errors  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from agents import plan_jobs  # noqa: E402
+from tools.fake_llm import fake_plan_text  # noqa: E402
+from tools.loadtest_api import percentile, print_report  # noqa: E402
+
+APP_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+class FlowFailed(Exception):
+    pass
+
+
+
+# Fake LLM
+def install_fake_llm(latency_ms, jitter_ms, error_rate, chunks=8):
+    """
+    Replace the streaming Gemini call used by background plan jobs.
+    """
+    def fake_stream(goal, milestones, constraints, progress, subtasks):
+        total = max(0.0, latency_ms + random.uniform(-jitter_ms, jitter_ms)) / 1000
+        if random.random() < error_rate:
+            time.sleep(total / 4)
+            raise errors.ServerError(503, {"error": {"code": 503, "message": "fake overload", "status": "UNAVAILABLE"}})
+
+        text = fake_plan_text(f"{goal}\n{milestones}\n{progress}\n{subtasks}")
+        step = max(1, len(text) // chunks)
+        for start in range(0, len(text), step):
+            time.sleep(total / chunks)
+            yield text[start:start + step]
+
+    plan_jobs.stream_detailed_plan = fake_stream
+
+
+
+# Session Flow
+def _button(at, prefix):
+    for button in at.button:
+        if button.label.startswith(prefix):
+            return button
+    raise FlowFailed(f"button {prefix!r} not found")
+
+
+def _has_subheader(at, text):
+    return any(text in h.value for h in at.subheader)
+
+
+def _wait_for(at, text, timeout, poll_interval):
+    """
+    Rerun the script (as the polling fragment would) until a subheader
+    containing text appears.
+    """
+    deadline = time.perf_counter() + timeout
+    while not _has_subheader(at, text):
+        if at.error:
+            raise FlowFailed(at.error[0].value)
+        if time.perf_counter() > deadline:
+            raise FlowFailed(f"timed out waiting for {text!r}")
+        time.sleep(poll_interval)
+        at.run()
+
+
+class Session:
+
+    def __init__(self, user_id, latencies, failures, timeout, poll_interval, toggles):
+        self.user_id = user_id
+        self.latencies = latencies
+        self.failures = failures
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.toggles = toggles
+
+    def timed(self, name, fn):
+        start = time.perf_counter()
+        try:
+            fn()
+        except Exception:
+            self.failures[name] += 1
+            raise
+        finally:
+            self.latencies[name].append(time.perf_counter() - start)
+
+    def run(self):
+        at = AppTest.from_file(APP_FILE, default_timeout=self.timeout)
+        at.run()
+        at.sidebar.text_area[0].input(f"Pass my statistics exam with distinction, load test user {self.user_id}")
+        at.sidebar.date_input[0].set_value(date.today() + timedelta(days=30))
+
+        def roadmap():
+            _button(at, "🚀").click().run()
+            _wait_for(at, "Road Map", self.timeout, self.poll_interval)
+
+        def reveal():
+            _button(at, "▶️").click().run()
+            if not at.checkbox:
+                raise FlowFailed("subtasks not revealed")
+
+        def toggle():
+            for checkbox in list(at.checkbox)[: self.toggles]:
+                checkbox.check().run()
+
+        def adapt():
+            _button(at, "🔄").click().run()
+            _wait_for(at, "what your progress means", self.timeout, self.poll_interval)
+
+        def download():
+            at.run()
+            if not at.get("download_button"):
+                raise FlowFailed("download button missing")
+
+        for name, step in (
+            ("roadmap", roadmap),
+            ("reveal_tasks", reveal),
+            ("toggle_subtask", toggle),
+            ("adapt", adapt),
+            ("download", download),
+        ):
+            self.timed(name, step)
+
+
+
+# Ramp
+def run_level(users, args):
+    latencies, failures = defaultdict(list), defaultdict(int)
+    completed = 0
+    lock = threading.Lock()
+
+    def one(user_id):
+        nonlocal completed
+        session = Session(user_id, latencies, failures, args.timeout, args.poll_interval, args.toggles)
+        try:
+            session.run()
+        except Exception:
+            return
+        with lock:
+            completed += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        list(pool.map(one, range(users * args.sessions_per_user)))
+    elapsed = time.perf_counter() - start
+    return latencies, failures, completed, elapsed
+
+
+def find_saturation(results, p95_factor, min_gain):
+    """
+    First concurrency level where completed flows/s grew by less than
+    min_gain over the previous level, or roadmap p95 exceeded p95_factor
+    times the single-level baseline.
+    """
+    baseline_p95 = None
+    previous_rate = None
+    for users, latencies, _, completed, elapsed in results:
+        rate = completed / elapsed
+        p95 = percentile(latencies["roadmap"], 95)
+        if baseline_p95 is None:
+            baseline_p95 = p95
+        elif p95 > baseline_p95 * p95_factor:
+            return users, f"roadmap p95 {p95 * 1000:.0f} ms > {p95_factor}x baseline {baseline_p95 * 1000:.0f} ms"
+        if previous_rate is not None and rate < previous_rate * (1 + min_gain):
+            return users, f"throughput {rate:.2f} flows/s vs {previous_rate:.2f} at the previous level"
+        previous_rate = rate
+    return None, "no saturation within the tested levels"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", default="1,2,4,8,16", help="comma-separated concurrent session counts")
+    parser.add_argument("--sessions-per-user", type=int, default=2, help="flows each concurrent slot runs")
+    parser.add_argument("--latency-ms", type=float, default=800)
+    parser.add_argument("--jitter-ms", type=float, default=200)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--toggles", type=int, default=3, help="subtasks ticked per session")
+    parser.add_argument("--poll-interval", type=float, default=0.25)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--p95-factor", type=float, default=2.0)
+    parser.add_argument("--min-gain", type=float, default=0.10)
+    args = parser.parse_args()
+
+    install_fake_llm(args.latency_ms, args.jitter_ms, args.error_rate)
+
+    results = []
+    for users in (int(level) for level in args.levels.split(",")):
+        latencies, failures, completed, elapsed = run_level(users, args)
+        results.append((users, latencies, failures, completed, elapsed))
+
+        print(f"\n=== {users} concurrent sessions: {completed} flows completed, "
+              f"{completed / elapsed:.2f} flows/s ===")
+        print_report(latencies, failures, elapsed)
+
+    level, reason = find_saturation(results, args.p95_factor, args.min_gain)
+    print(f"\nSaturation point: {level if level else '-'} concurrent sessions ({reason})")
+    print(f"Artifacts written to {_WORKDIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Aggregate rerun profiles written with ACHIEVIT_PROFILE=1.
+
+    python -m tools.profile_report
+    python -m tools.profile_report --action adapt_plan --sort tottime --limit 15
+"""
+import argparse
+import glob
+import json
+import os
+import pstats
+from collections import defaultdict
+
+from utils.profiling import PROFILE_DIR
+
+
+def _matches(meta_path, action):
+    if not action:
+        return True
+    with open(meta_path) as f:
+        return action in json.load(f)["actions"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", default=PROFILE_DIR)
+    parser.add_argument("--action", help="only runs that handled this action, e.g. get_roadmap")
+    parser.add_argument("--sort", default="cumulative", choices=["cumulative", "tottime", "ncalls"])
+    parser.add_argument("--limit", type=int, default=25)
+    args = parser.parse_args()
+
+    runs = [
+        path for path in sorted(glob.glob(os.path.join(args.dir, "*.json")))
+        if _matches(path, args.action)
+    ]
+    if not runs:
+        print(f"No profiles found in {args.dir}")
+        return
+
+    sections = defaultdict(list)
+    blob_bytes = []
+    for path in runs:
+        with open(path) as f:
+            meta = json.load(f)
+        for name, seconds in meta["sections"].items():
+            sections[name].append(seconds)
+        blob_bytes.append(meta.get("session_blob_bytes", 0))
+
+    print(f"{len(runs)} runs, session blobs mean {sum(blob_bytes) / len(blob_bytes) / 1024:.1f} KiB, "
+          f"max {max(blob_bytes) / 1024:.1f} KiB\n")
+    print(f"{'section':<28}{'runs':>6}{'mean ms':>10}{'max ms':>10}")
+    for name, samples in sorted(sections.items(), key=lambda item: -sum(item[1])):
+        print(f"{name:<28}{len(samples):>6}{sum(samples) / len(samples) * 1000:>10.1f}{max(samples) * 1000:>10.1f}")
+    print()
+
+    # Runs overlapping a profiled one only carry wall-clock sections.
+    profiles = [path[:-len(".json")] + ".prof" for path in runs]
+    profiles = [path for path in profiles if os.path.exists(path)]
+    if not profiles:
+        return
+    print(f"cProfile data from {len(profiles)} of {len(runs)} runs")
+    stats = pstats.Stats(*profiles)
+    stats.strip_dirs().sort_stats(args.sort).print_stats(args.limit)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Backup, restore and migrate the progress store without loading it whole.
+
+Stores are picked by extension: .json (progress file) or .db/.sqlite (SQLite).
+
+    python -m tools.progress_migrate export data/progress.json backup.jsonl
+    python -m tools.progress_migrate import backup.jsonl data/progress.db
+    python -m tools.progress_migrate migrate data/progress.json data/progress.db
+    python -m tools.progress_migrate verify data/progress.json data/progress.db
+"""
+import argparse
+import sys
+import time
+
+from utils import progress_store
+
+
+def _export(args):
+    store = progress_store.open_store(args.store)
+    if args.out == "-":
+        manifest = progress_store.export_jsonl(store, sys.stdout)
+    else:
+        with open(args.out, "w") as out:
+            manifest = progress_store.export_jsonl(store, out)
+    return manifest["count"], manifest
+
+
+def _import(args):
+    store = progress_store.open_store(args.store)
+    count = progress_store.import_jsonl(
+        args.jsonl, store, batch_size=args.batch_size, verify=not args.no_verify
+    )
+    return count, None
+
+
+def _migrate(args):
+    src = progress_store.open_store(args.src)
+    dst = progress_store.open_store(args.dst)
+    manifest = progress_store.migrate(src, dst, batch_size=args.batch_size)
+    return manifest["count"], manifest
+
+
+def _verify(args):
+    src = progress_store.open_store(args.src)
+    dst = progress_store.open_store(args.dst)
+    progress_store.verify(src, dst)
+    manifest = progress_store.fingerprint_store(src).as_dict()
+    return manifest["count"], manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="stream a store to JSONL")
+    export.add_argument("store")
+    export.add_argument("out", help="output file, or - for stdout")
+    export.set_defaults(run=_export)
+
+    load = commands.add_parser("import", help="batch-import JSONL into a store (resumable)")
+    load.add_argument("jsonl")
+    load.add_argument("store")
+    load.add_argument("--batch-size", type=int, default=progress_store.DEFAULT_BATCH_SIZE)
+    load.add_argument(
+        "--no-verify",
+        action="store_true",
+        help="accept files without checksums or manifest (e.g. hand-written)",
+    )
+    load.set_defaults(run=_import)
+
+    move = commands.add_parser("migrate", help="copy one store into another and verify")
+    move.add_argument("src")
+    move.add_argument("dst")
+    move.add_argument("--batch-size", type=int, default=progress_store.DEFAULT_BATCH_SIZE)
+    move.set_defaults(run=_migrate)
+
+    check = commands.add_parser("verify", help="check every record of src is in dst")
+    check.add_argument("src")
+    check.add_argument("dst")
+    check.set_defaults(run=_verify)
+
+    args = parser.parse_args()
+    start = time.perf_counter()
+    try:
+        count, manifest = args.run(args)
+    except progress_store.IntegrityError as e:
+        print(f"❌ Integrity check failed: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"✅ {args.command}: {count} records in {elapsed:.2f}s ({count / max(elapsed, 1e-9):.0f} records/s)",
+        file=sys.stderr,
+    )
+    if manifest:
+        print(f"   fingerprint {manifest['fingerprint']}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
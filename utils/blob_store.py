@@ -0,0 +1,229 @@
+"""
+Content-addressed local blob store for large per-session artifacts.
+
+Session state keeps only the sha256 reference of plan texts and DOCX
+exports; the bytes live on disk under data/blobs and a process-wide LRU
+cache keeps recently used blobs in memory up to a fixed budget. Identical
+content (e.g. the same plan in many sessions) is stored and cached once.
+
+Blobs are reference counted per session. When no session references a blob
+any more it is removed from memory and disk; blobs left behind by earlier
+processes are swept once they are older than ORPHAN_MAX_AGE_SECONDS. The
+store assumes one Streamlit process owns data/blobs.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+BLOB_DIR = os.getenv("ACHIEVIT_BLOB_DIR", "data/blobs")
+MEMORY_BUDGET_BYTES = int(os.getenv("ACHIEVIT_BLOB_MEMORY_BUDGET_BYTES", str(64 * 1024 * 1024)))
+
+# Sessions untouched for this long are released automatically.
+SESSION_IDLE_SECONDS = 6 * 60 * 60
+
+# Unreferenced files older than this are deleted by sweep().
+ORPHAN_MAX_AGE_SECONDS = 24 * 60 * 60
+SWEEP_INTERVAL_SECONDS = 15 * 60
+
+
+class BlobStore:
+
+    def __init__(self, root=BLOB_DIR, memory_budget=MEMORY_BUDGET_BYTES):
+        self.root = root
+        self.memory_budget = memory_budget
+        self._cache = OrderedDict()
+        self._cache_bytes = 0
+        # session_id -> ({ref: size}, last touched)
+        self._sessions = {}
+        self._refcounts = {}
+        self._last_sweep = 0.0
+        self._lock = threading.Lock()
+
+    def _path(self, ref):
+        return os.path.join(self.root, ref[:2], ref)
+
+    # Memory cache
+    def _remember(self, ref, data):
+        with self._lock:
+            if ref in self._cache:
+                self._cache.move_to_end(ref)
+                return
+            if len(data) > self.memory_budget:
+                return
+            self._cache[ref] = data
+            self._cache_bytes += len(data)
+            while self._cache_bytes > self.memory_budget:
+                _, evicted = self._cache.popitem(last=False)
+                self._cache_bytes -= len(evicted)
+
+    def _cached(self, ref):
+        with self._lock:
+            data = self._cache.get(ref)
+            if data is not None:
+                self._cache.move_to_end(ref)
+            return data
+
+    # Blobs
+    def put(self, data: bytes, session_id=None) -> str:
+        """
+        Store bytes and return their sha256 reference.
+        """
+        ref = hashlib.sha256(data).hexdigest()
+        path = self._path(ref)
+        # Held so a concurrent release cannot delete the file between the
+        # existence check and taking the session reference.
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            if session_id:
+                self._track(session_id, ref, len(data))
+
+        self._remember(ref, data)
+        self._maybe_sweep()
+        return ref
+
+    def get(self, ref: str, session_id=None) -> bytes:
+        """
+        Read a blob. Passing the reading session keeps it from being
+        released as idle. Raises FileNotFoundError if the blob was deleted.
+        """
+        if session_id:
+            self._touch(session_id)
+        data = self._cached(ref)
+        if data is None:
+            with open(self._path(ref), "rb") as f:
+                data = f.read()
+            self._remember(ref, data)
+        return data
+
+    def put_text(self, text: str, session_id=None) -> str:
+        return self.put(text.encode("utf-8"), session_id)
+
+    def get_text(self, ref: str, session_id=None) -> str:
+        return self.get(ref, session_id).decode("utf-8")
+
+    # Reference counting
+    def _drop_ref(self, ref):
+        # Caller holds the lock.
+        self._refcounts[ref] -= 1
+        if self._refcounts[ref] > 0:
+            return
+        del self._refcounts[ref]
+        data = self._cache.pop(ref, None)
+        if data is not None:
+            self._cache_bytes -= len(data)
+        try:
+            os.remove(self._path(ref))
+        except FileNotFoundError:
+            pass
+
+    def _drop_session(self, session_id):
+        # Caller holds the lock.
+        refs, _ = self._sessions.pop(session_id, ({}, 0))
+        for ref in refs:
+            self._drop_ref(ref)
+
+    def _track(self, session_id, ref, size):
+        # Caller holds the lock.
+        now = time.time()
+        refs, _ = self._sessions.get(session_id, ({}, now))
+        if ref not in refs:
+            refs[ref] = size
+            self._refcounts[ref] = self._refcounts.get(ref, 0) + 1
+        self._sessions[session_id] = (refs, now)
+
+        for sid, (_, touched) in list(self._sessions.items()):
+            if now - touched > SESSION_IDLE_SECONDS:
+                self._drop_session(sid)
+
+    def _touch(self, session_id):
+        with self._lock:
+            if session_id in self._sessions:
+                refs, _ = self._sessions[session_id]
+                self._sessions[session_id] = (refs, time.time())
+
+    def track(self, session_id, ref):
+        """
+        Record that a session holds a reference to an existing blob.
+        """
+        with self._lock:
+            self._track(session_id, ref, os.path.getsize(self._path(ref)))
+
+    def untrack(self, session_id, ref):
+        """
+        Drop one session reference, e.g. when a plan is replaced.
+        """
+        with self._lock:
+            refs, _ = self._sessions.get(session_id, ({}, 0))
+            if refs.pop(ref, None) is not None:
+                self._drop_ref(ref)
+
+    def release(self, session_id):
+        """
+        Drop every reference a session holds.
+        """
+        with self._lock:
+            self._drop_session(session_id)
+
+    def sweep(self, max_age=ORPHAN_MAX_AGE_SECONDS):
+        """
+        Delete unreferenced blob files older than max_age seconds, such as
+        those left by sessions of an earlier process. Returns files removed.
+        """
+        if not os.path.isdir(self.root):
+            return 0
+        cutoff = time.time() - max_age
+        removed = 0
+        for shard in os.listdir(self.root):
+            shard_dir = os.path.join(self.root, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for name in os.listdir(shard_dir):
+                path = os.path.join(shard_dir, name)
+                with self._lock:
+                    if name in self._refcounts:
+                        continue
+                    try:
+                        if os.path.getmtime(path) < cutoff:
+                            os.remove(path)
+                            removed += 1
+                    except FileNotFoundError:
+                        pass
+        return removed
+
+    def _maybe_sweep(self):
+        now = time.time()
+        with self._lock:
+            if now - self._last_sweep < SWEEP_INTERVAL_SECONDS:
+                return
+            self._last_sweep = now
+        self.sweep()
+
+    # Accounting
+    def session_bytes(self, session_id) -> int:
+        """
+        Total size of the blobs a session references.
+        """
+        with self._lock:
+            refs, _ = self._sessions.get(session_id, ({}, 0))
+            return sum(refs.values())
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "cache_bytes": self._cache_bytes,
+                "cache_blobs": len(self._cache),
+                "memory_budget": self.memory_budget,
+                "referenced_blobs": len(self._refcounts),
+                "sessions": {sid: sum(refs.values()) for sid, (refs, _) in self._sessions.items()},
+            }
+
+
+# Process-wide store shared by all Streamlit sessions.
+blobs = BlobStore()
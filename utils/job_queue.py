@@ -0,0 +1,400 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+JOBS_DB = os.getenv("ACHIEVIT_JOBS_DB", "data/jobs.db")
+MAX_WORKERS = int(os.getenv("ACHIEVIT_JOB_WORKERS", "4"))
+
+# Speculative jobs get their own small pool so they never hold a worker
+# an interactive request is waiting for.
+SPECULATIVE_WORKERS = int(os.getenv("ACHIEVIT_SPECULATIVE_WORKERS", "1"))
+
+# Minimum seconds between partial-result writes for a streaming job.
+PARTIAL_WRITE_INTERVAL = 0.5
+
+# Finished jobs (with their params and result text) are deleted after this.
+RETENTION_SECONDS = float(os.getenv("ACHIEVIT_JOB_RETENTION_SECONDS", str(7 * 24 * 60 * 60)))
+PRUNE_INTERVAL_SECONDS = 60 * 60
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+_runners = {}
+_executor = None
+_speculative_executor = None
+_init_lock = threading.Lock()
+
+# In-process bookkeeping used for cancellation and speculative backoff.
+_state_lock = threading.Lock()
+_cancelled = set()
+# Interactive jobs queued or running.
+_interactive_running = 0
+_speculative_pending = 0
+# Speculative jobs running and not yet adopted; an interactive submit
+# cancels them so they never compete with it for LLM quota.
+_speculative_running = set()
+_last_prune = 0.0
+
+
+class JobError(Exception):
+    """
+    Raised by a runner to fail a job with a user-facing message.
+    """
+
+
+class JobCancelled(Exception):
+    """
+    Raised from report() to stop a runner whose job was cancelled.
+    """
+
+
+
+# Storage
+@contextmanager
+def _connect():
+    conn = sqlite3.connect(JOBS_DB, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def _init_db():
+    os.makedirs(os.path.dirname(JOBS_DB) or ".", exist_ok=True)
+    with _connect() as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                status TEXT NOT NULL,
+                params TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                first_output_at REAL,
+                finished_at REAL,
+                speculative INTEGER NOT NULL DEFAULT 0,
+                owner_pid INTEGER
+            )
+            """
+        )
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+        if "speculative" not in columns:
+            conn.execute("ALTER TABLE jobs ADD COLUMN speculative INTEGER NOT NULL DEFAULT 0")
+        if "owner_pid" not in columns:
+            conn.execute("ALTER TABLE jobs ADD COLUMN owner_pid INTEGER")
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_finished_at ON jobs (finished_at)")
+
+        # Each process runs its own jobs, so pending jobs of a process that
+        # has exited will never complete. Jobs of live processes sharing
+        # the database are left alone.
+        pending = conn.execute(
+            "SELECT DISTINCT owner_pid FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)
+        ).fetchall()
+        for (pid,) in pending:
+            if _process_alive(pid):
+                continue
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? "
+                "WHERE status IN (?, ?) AND owner_pid IS ?",
+                (FAILED, "Interrupted by a server restart. Please try again.", time.time(), QUEUED, RUNNING, pid),
+            )
+    prune()
+
+
+def _process_alive(pid):
+    # A recorded pid equal to ours belonged to an earlier process.
+    if pid is None or pid == os.getpid():
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _update(job_id, **fields):
+    columns = ", ".join(f"{name} = ?" for name in fields)
+    with _connect() as conn:
+        conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+
+def _transition(job_id, expected, **fields):
+    """
+    Update a job only if it is still in the expected status, so a
+    concurrent cancel() is never overwritten. Returns whether it applied.
+    """
+    columns = ", ".join(f"{name} = ?" for name in fields)
+    with _connect() as conn:
+        return conn.execute(
+            f"UPDATE jobs SET {columns} WHERE id = ? AND status = ?",
+            (*fields.values(), job_id, expected),
+        ).rowcount > 0
+
+
+def _ensure_started():
+    global _executor, _speculative_executor
+    with _init_lock:
+        if _executor is None:
+            _init_db()
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="achievit-job")
+            _speculative_executor = ThreadPoolExecutor(
+                max_workers=SPECULATIVE_WORKERS, thread_name_prefix="achievit-speculative"
+            )
+    return _executor, _speculative_executor
+
+
+
+# Execution
+def register(kind):
+    """
+    Decorator registering a runner for a job kind.
+
+    A runner is called as runner(params, report) and returns the final
+    result text; report(partial_text) publishes intermediate output.
+    """
+    def decorator(fn):
+        _runners[kind] = fn
+        return fn
+    return decorator
+
+
+def _claim(job_id, speculative):
+    """
+    Decide whether a dequeued job should run, and mark it running.
+    """
+    with _state_lock:
+        if job_id in _cancelled:
+            return False
+        deferred = speculative and _interactive_running
+        if speculative and not deferred:
+            _speculative_running.add(job_id)
+
+    if deferred:
+        _transition(
+            job_id,
+            QUEUED,
+            status=CANCELLED,
+            error="Deferred: interactive requests were in progress.",
+            finished_at=time.time(),
+        )
+        return False
+
+    return _transition(job_id, QUEUED, status=RUNNING, started_at=time.time())
+
+
+def _execute(job_id, kind, params, speculative=False):
+    global _interactive_running, _speculative_pending
+    # submit() counted this job; the count is released however it ends.
+    try:
+        if _claim(job_id, speculative):
+            _run(job_id, kind, params)
+    finally:
+        with _state_lock:
+            _cancelled.discard(job_id)
+            if speculative:
+                _speculative_running.discard(job_id)
+                _speculative_pending -= 1
+            else:
+                _interactive_running -= 1
+
+
+def _run(job_id, kind, params):
+    last_write = 0.0
+    first_output = None
+
+    def report(partial):
+        nonlocal last_write, first_output
+        if job_id in _cancelled:
+            raise JobCancelled()
+        now = time.time()
+        if first_output is None:
+            first_output = now
+            _update(job_id, result=partial, first_output_at=now)
+            last_write = now
+        elif now - last_write >= PARTIAL_WRITE_INTERVAL:
+            _update(job_id, result=partial)
+            last_write = now
+
+    try:
+        result = _runners[kind](params, report)
+    except JobCancelled:
+        # cancel() has already recorded the status.
+        return
+    except JobError as e:
+        _transition(job_id, RUNNING, status=FAILED, error=str(e), finished_at=time.time())
+    except Exception as e:
+        _transition(
+            job_id,
+            RUNNING,
+            status=FAILED,
+            error=f"An unexpected error occurred ({type(e).__name__}). Please try again.",
+            finished_at=time.time(),
+        )
+    else:
+        _transition(
+            job_id,
+            RUNNING,
+            status=DONE,
+            result=result,
+            first_output_at=first_output or time.time(),
+            finished_at=time.time(),
+        )
+
+
+
+# Public API
+def submit(kind, params, speculative=False):
+    """
+    Queue a job and return its id. params must be JSON-serialisable.
+
+    Speculative jobs run on a separate pool and are cancelled rather
+    than started while interactive jobs are queued or running. Submitting
+    an interactive job also cancels speculative jobs already running.
+    """
+    global _interactive_running, _speculative_pending
+    if kind not in _runners:
+        raise ValueError(f"No runner registered for job kind '{kind}'")
+
+    executor, speculative_executor = _ensure_started()
+    job_id = uuid.uuid4().hex
+    with _connect() as conn:
+        conn.execute(
+            "INSERT INTO jobs (id, kind, status, params, created_at, speculative, owner_pid) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (job_id, kind, QUEUED, json.dumps(params), time.time(), int(speculative), os.getpid()),
+        )
+    _maybe_prune()
+
+    if speculative:
+        with _state_lock:
+            _speculative_pending += 1
+        speculative_executor.submit(_execute, job_id, kind, params, True)
+        return job_id
+
+    # Counted and flagged together so a speculative job cannot start, or
+    # be adopted, between the two.
+    with _state_lock:
+        _interactive_running += 1
+        preempted = list(_speculative_running)
+        _speculative_running.clear()
+        _cancelled.update(preempted)
+    for speculative_id in preempted:
+        cancel(speculative_id, reason="Stopped for an interactive request.")
+
+    try:
+        executor.submit(_execute, job_id, kind, params)
+    except BaseException:
+        with _state_lock:
+            _interactive_running -= 1
+        raise
+    return job_id
+
+
+def adopt(job_id):
+    """
+    Treat a speculative job as interactive from now on, so later submits
+    do not cancel it. Returns False if it has already been cancelled.
+    """
+    with _state_lock:
+        if job_id in _cancelled:
+            return False
+        _speculative_running.discard(job_id)
+        return True
+
+
+def cancel(job_id, reason="Cancelled."):
+    """
+    Cancel a queued or running job. A running job stops at its next
+    partial-output report; finished jobs are left untouched.
+    """
+    # Flag first so a runner finishing concurrently does not mark it done.
+    with _state_lock:
+        _cancelled.add(job_id)
+    with _connect() as conn:
+        updated = conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ? AND status IN (?, ?)",
+            (CANCELLED, reason, time.time(), job_id, QUEUED, RUNNING),
+        ).rowcount
+    if not updated:
+        with _state_lock:
+            _cancelled.discard(job_id)
+    return bool(updated)
+
+
+def prune(max_age=None):
+    """
+    Delete jobs that finished more than max_age seconds ago (default
+    RETENTION_SECONDS). Returns the number removed.
+    """
+    global _last_prune
+    max_age = RETENTION_SECONDS if max_age is None else max_age
+    with _state_lock:
+        _last_prune = time.time()
+    with _connect() as conn:
+        return conn.execute(
+            "DELETE FROM jobs WHERE finished_at < ? AND status IN (?, ?, ?)",
+            (time.time() - max_age, *FINISHED),
+        ).rowcount
+
+
+def _maybe_prune():
+    with _state_lock:
+        if time.time() - _last_prune < PRUNE_INTERVAL_SECONDS:
+            return
+    prune()
+
+
+def speculative_backlog():
+    """
+    Number of speculative jobs queued or running in this process.
+    """
+    with _state_lock:
+        return _speculative_pending
+
+
+def get(job_id):
+    """
+    Fetch a job record, or None if unknown.
+
+    Returns:
+    {
+        "id", "kind", "status", "params", "result", "error", "speculative",
+        "created_at", "started_at", "first_output_at", "finished_at",
+        "timings": { "queued_s", "first_output_s", "run_s" }
+    }
+    """
+    _ensure_started()
+    with _connect() as conn:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if row is None:
+        return None
+
+    job = dict(row)
+    job["params"] = json.loads(job["params"])
+    job["speculative"] = bool(job["speculative"])
+
+    def elapsed(start, end):
+        return round(end - start, 3) if start and end else None
+
+    job["timings"] = {
+        "queued_s": elapsed(job["created_at"], job["started_at"]),
+        "first_output_s": elapsed(job["started_at"], job["first_output_at"]),
+        "run_s": elapsed(job["started_at"], job["finished_at"]),
+    }
+    return job
@@ -0,0 +1,284 @@
+"""
+Versioned storage for roadmap and adapted plan texts.
+
+Every plan generated for a goal is kept as a numbered version so exports and
+adaptation diffs can read earlier plans without calling Gemini again.
+
+- Texts are stored once per sha256 (identical plans share one blob).
+- Blobs are zlib-compressed. A new version is compressed with the previous
+  version as a preset dictionary, so the mostly repeated LLM text between
+  adaptations costs little more than its changes. Dictionary chains are
+  capped at MAX_CHAIN_DEPTH so a read never decodes more than that many blobs.
+- (goal_id, version) is the primary key of the versions table. Versions are
+  numbered inside a BEGIN IMMEDIATE transaction so concurrent saves for a
+  goal queue up instead of colliding on the key.
+"""
+import difflib
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+
+PLANS_DB = os.getenv("ACHIEVIT_PLANS_DB", "data/plans.db")
+MAX_CHAIN_DEPTH = 8
+COMPRESSION_LEVEL = 9
+
+# zlib only uses the last 32 KiB of a preset dictionary.
+_ZDICT_LIMIT = 32 * 1024
+
+_init_lock = threading.Lock()
+_initialised = set()
+
+
+@contextmanager
+def _connect():
+    with _init_lock:
+        if PLANS_DB not in _initialised:
+            _init_db()
+            _initialised.add(PLANS_DB)
+    conn = sqlite3.connect(PLANS_DB, timeout=30)
+    conn.row_factory = sqlite3.Row
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def _init_db():
+    os.makedirs(os.path.dirname(PLANS_DB) or ".", exist_ok=True)
+    conn = sqlite3.connect(PLANS_DB, timeout=30)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS plan_blobs (
+                hash TEXT PRIMARY KEY,
+                base_hash TEXT,
+                depth INTEGER NOT NULL,
+                raw_size INTEGER NOT NULL,
+                data BLOB NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS plan_versions (
+                goal_id TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                kind TEXT NOT NULL,
+                hash TEXT NOT NULL REFERENCES plan_blobs(hash),
+                progress TEXT,
+                created_at TEXT NOT NULL,
+                job_id TEXT,
+                PRIMARY KEY (goal_id, version)
+            )
+            """
+        )
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(plan_versions)")}
+        if "job_id" not in columns:
+            conn.execute("ALTER TABLE plan_versions ADD COLUMN job_id TEXT")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+
+# Blobs
+def _zdict(base_text):
+    return base_text.encode("utf-8")[-_ZDICT_LIMIT:]
+
+
+def _compress(text, base_text=None):
+    if base_text is None:
+        compressor = zlib.compressobj(COMPRESSION_LEVEL)
+    else:
+        compressor = zlib.compressobj(COMPRESSION_LEVEL, zdict=_zdict(base_text))
+    return compressor.compress(text.encode("utf-8")) + compressor.flush()
+
+
+@lru_cache(maxsize=256)
+def _text_for_hash(blob_hash):
+    with _connect() as conn:
+        row = conn.execute(
+            "SELECT base_hash, data FROM plan_blobs WHERE hash = ?", (blob_hash,)
+        ).fetchone()
+    if row is None:
+        raise KeyError(blob_hash)
+
+    if row["base_hash"] is None:
+        decompressor = zlib.decompressobj()
+    else:
+        decompressor = zlib.decompressobj(zdict=_zdict(_text_for_hash(row["base_hash"])))
+    return (decompressor.decompress(row["data"]) + decompressor.flush()).decode("utf-8")
+
+
+def _store_blob(conn, text, base_hash):
+    blob_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    if conn.execute("SELECT 1 FROM plan_blobs WHERE hash = ?", (blob_hash,)).fetchone():
+        return blob_hash
+
+    depth = 0
+    if base_hash is not None:
+        base_depth = conn.execute(
+            "SELECT depth FROM plan_blobs WHERE hash = ?", (base_hash,)
+        ).fetchone()["depth"]
+        depth = base_depth + 1
+        if depth > MAX_CHAIN_DEPTH:
+            base_hash, depth = None, 0
+
+    base_text = _text_for_hash(base_hash) if base_hash else None
+    conn.execute(
+        "INSERT INTO plan_blobs (hash, base_hash, depth, raw_size, data) VALUES (?, ?, ?, ?, ?)",
+        (blob_hash, base_hash, depth, len(text.encode("utf-8")), _compress(text, base_text)),
+    )
+    return blob_hash
+
+
+
+# Public API
+def save_version(goal_id, plan_text, kind, progress=None, job_id=None):
+    """
+    Store plan_text as the next version for goal_id and return its number.
+
+    kind: "roadmap" or "adapted"
+    progress (optional): milestone -> percentage at generation time
+    job_id (optional): generation job the text came from; saving a job's
+        result again (e.g. when a refreshed session restores the job)
+        returns the version it was first stored as
+
+    Saving the same text as the latest version is a no-op that returns
+    the latest version number.
+    """
+    with _connect() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        if job_id is not None:
+            saved = conn.execute(
+                "SELECT version FROM plan_versions WHERE goal_id = ? AND job_id = ?",
+                (goal_id, job_id),
+            ).fetchone()
+            if saved:
+                return saved["version"]
+
+        latest = conn.execute(
+            "SELECT version, hash FROM plan_versions WHERE goal_id = ? ORDER BY version DESC LIMIT 1",
+            (goal_id,),
+        ).fetchone()
+
+        blob_hash = _store_blob(conn, plan_text, latest["hash"] if latest else None)
+        if latest and latest["hash"] == blob_hash:
+            return latest["version"]
+
+        version = latest["version"] + 1 if latest else 1
+        conn.execute(
+            "INSERT INTO plan_versions (goal_id, version, kind, hash, progress, created_at, job_id) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                goal_id,
+                version,
+                kind,
+                blob_hash,
+                json.dumps(progress) if progress is not None else None,
+                datetime.utcnow().isoformat(),
+                job_id,
+            ),
+        )
+        return version
+
+
+def list_versions(goal_id):
+    """
+    Version metadata for a goal, oldest first (no plan texts).
+    """
+    with _connect() as conn:
+        rows = conn.execute(
+            "SELECT version, kind, hash, progress, created_at FROM plan_versions "
+            "WHERE goal_id = ? ORDER BY version",
+            (goal_id,),
+        ).fetchall()
+    return [
+        {
+            "version": row["version"],
+            "kind": row["kind"],
+            "hash": row["hash"],
+            "progress": json.loads(row["progress"]) if row["progress"] else None,
+            "created_at": row["created_at"],
+        }
+        for row in rows
+    ]
+
+
+def load_version(goal_id, version=None):
+    """
+    Load a plan version (latest when version is None), or None if missing.
+
+    Returns:
+    {
+        "version", "kind", "hash", "progress", "created_at",
+        "text": plan text
+    }
+    """
+    query = "SELECT version, kind, hash, progress, created_at FROM plan_versions WHERE goal_id = ?"
+    params = [goal_id]
+    if version is None:
+        query += " ORDER BY version DESC LIMIT 1"
+    else:
+        query += " AND version = ?"
+        params.append(version)
+
+    with _connect() as conn:
+        row = conn.execute(query, params).fetchone()
+    if row is None:
+        return None
+
+    return {
+        "version": row["version"],
+        "kind": row["kind"],
+        "hash": row["hash"],
+        "progress": json.loads(row["progress"]) if row["progress"] else None,
+        "created_at": row["created_at"],
+        "text": _text_for_hash(row["hash"]),
+    }
+
+
+def diff_versions(goal_id, old_version, new_version):
+    """
+    Unified diff between two stored versions of a goal's plan.
+    """
+    old = load_version(goal_id, old_version)
+    new = load_version(goal_id, new_version)
+    if old is None or new is None:
+        raise KeyError(f"Unknown version for goal '{goal_id}'")
+
+    return "\n".join(
+        difflib.unified_diff(
+            old["text"].splitlines(),
+            new["text"].splitlines(),
+            fromfile=f"v{old_version} ({old['kind']})",
+            tofile=f"v{new_version} ({new['kind']})",
+            lineterm="",
+        )
+    )
+
+
+def stats():
+    """
+    Storage totals: raw vs stored bytes across all unique blobs.
+    """
+    with _connect() as conn:
+        blobs = conn.execute(
+            "SELECT COUNT(*) AS n, COALESCE(SUM(raw_size), 0) AS raw, "
+            "COALESCE(SUM(LENGTH(data)), 0) AS stored FROM plan_blobs"
+        ).fetchone()
+        versions = conn.execute("SELECT COUNT(*) FROM plan_versions").fetchone()[0]
+    return {
+        "versions": versions,
+        "blobs": blobs["n"],
+        "raw_bytes": blobs["raw"],
+        "stored_bytes": blobs["stored"],
+    }
@@ -0,0 +1,141 @@
+"""
+Opt-in profiling of Streamlit reruns.
+
+Enabled with ACHIEVIT_PROFILE=1 when the app is started through
+profile_app.py (streamlit run profile_app.py), which wraps each script run
+in run() so it is closed however it ends. Each run is recorded with cProfile
+and written to data/profiles as <timestamp>_<session>_<action>.prof, with a
+.json sidecar holding the session, the actions handled in that run and
+wall-clock timings of the instrumented sections. Aggregate them with
+tools/profile_report.py. When disabled every hook is a no-op.
+
+cProfile can only be active once per process (Python 3.12 enforces this),
+so while one session's run is being profiled, concurrent runs record their
+sections and wall-clock time only and write no .prof file.
+"""
+import cProfile
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from utils.blob_store import blobs
+
+ENABLED = os.getenv("ACHIEVIT_PROFILE", "").lower() in ("1", "true", "yes")
+PROFILE_DIR = os.getenv("ACHIEVIT_PROFILE_DIR", "data/profiles")
+
+# Streamlit runs each session's script on its own thread.
+_local = threading.local()
+
+# Held by the one run that owns cProfile.
+_profiler_lock = threading.Lock()
+
+
+def _current():
+    return getattr(_local, "run", None)
+
+
+def start_run(session_id):
+    """
+    Begin profiling a script run. Call once near the top of app.py; only
+    records when the page is executed through run().
+    """
+    if not ENABLED or not getattr(_local, "entry", False):
+        return
+    finish_run()
+
+    profiler = cProfile.Profile() if _profiler_lock.acquire(blocking=False) else None
+    _local.run = {
+        "profiler": profiler,
+        "session": session_id,
+        "started_at": time.time(),
+        "start": time.perf_counter(),
+        "actions": [],
+        "sections": {},
+    }
+    if profiler is not None:
+        profiler.enable()
+
+
+def finish_run():
+    """
+    Stop profiling the current run and write it out. Safe to call twice.
+    """
+    run = _current()
+    if run is None:
+        return
+    _local.run = None
+    profiler = run["profiler"]
+    if profiler is not None:
+        profiler.disable()
+        _profiler_lock.release()
+
+    action = "+".join(run["actions"]) or "rerun"
+    stamp = datetime.fromtimestamp(run["started_at"]).strftime("%Y%m%dT%H%M%S%f")
+    base = os.path.join(PROFILE_DIR, f"{stamp}_{run['session'][:8]}_{action}")
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    if profiler is not None:
+        profiler.dump_stats(f"{base}.prof")
+    with open(f"{base}.json", "w") as f:
+        json.dump(
+            {
+                "session": run["session"],
+                "started_at": datetime.fromtimestamp(run["started_at"]).isoformat(),
+                "wall_seconds": round(time.perf_counter() - run["start"], 6),
+                "cprofile": profiler is not None,
+                "actions": run["actions"],
+                "sections": run["sections"],
+                "session_blob_bytes": blobs.session_bytes(run["session"]),
+                "blob_store": {k: v for k, v in blobs.stats().items() if k != "sessions"},
+            },
+            f,
+            indent=4,
+        )
+
+
+def run(path):
+    """
+    Execute the Streamlit page at path, finishing the profiled run when
+    the script ends, whether normally, by st.rerun()/st.stop() or an error.
+    """
+    with open(path) as f:
+        code = compile(f.read(), path, "exec")
+
+    _local.entry = True
+    try:
+        exec(code, {"__name__": "__main__", "__file__": path})
+    finally:
+        _local.entry = False
+        finish_run()
+
+
+@contextmanager
+def section(name):
+    """
+    Time a block within the current run.
+    """
+    run = _current()
+    if run is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        run["sections"][name] = round(time.perf_counter() - start, 6)
+
+
+@contextmanager
+def action(name):
+    """
+    Like section, but also names the run after the user action it handles.
+    """
+    run = _current()
+    if run is not None:
+        run["actions"].append(name)
+    with section(name):
+        yield
@@ -1,10 +1,55 @@
-
-
 import json
 import os
+import tempfile
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 
-PROGRESS_FILE = "data/progress.json"
+try:
+    import fcntl
+except ImportError:  # Windows: single-process only
+    fcntl = None
+
+PROGRESS_FILE = os.getenv("ACHIEVIT_PROGRESS_FILE", "data/progress.json")
+
+# Serialises read-modify-write cycles between threads (Streamlit sessions,
+# API workers); _locked() adds an flock so separate processes (several
+# uvicorn workers, Streamlit next to the API) are serialised too.
+_LOCK = threading.Lock()
+
+
+@contextmanager
+def _locked(path=None):
+    path = path or PROGRESS_FILE
+    with _LOCK:
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(f"{path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+@contextmanager
+def _atomic_writer(path):
+    """
+    Open a uniquely named temp file next to path and move it over path
+    once the block completes; the temp file is removed on failure.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".progress-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            yield f
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
 
 
 def _load_all():
@@ -15,12 +60,39 @@ def _load_all():
 
 
 def _save_all(data):
-    os.makedirs(os.path.dirname(PROGRESS_FILE), exist_ok=True)
-    with open(PROGRESS_FILE, "w") as f:
+    with _atomic_writer(PROGRESS_FILE) as f:
         json.dump(data, f, indent=4)
 
 
 
+# Progress Helpers
+def goal_id_for(goal):
+    """
+    Derive the storage key for a goal description.
+    """
+    return goal.lower().replace(" ", "_")
+
+
+def compute_progress(progress_matrix):
+    computed = {}
+    for milestone, subtasks in progress_matrix.items():
+        total = len(subtasks)
+        done = sum(subtasks.values())
+        computed[milestone] = int((done / total) * 100)
+    return computed
+
+
+def summarize_subtasks(progress_matrix):
+    summary = {}
+    for milestone, subtasks in progress_matrix.items():
+        summary[milestone] = {
+            "completed": [s for s, done in subtasks.items() if done],
+            "pending": [s for s, done in subtasks.items() if not done],
+        }
+    return summary
+
+
+
 # Public API
 def load_progress(goal_id):
     """
@@ -30,6 +102,8 @@ def load_progress(goal_id):
     {
         "execution": { milestone: { subtask: bool } },
         "computed": { milestone: percentage },
+        "goal": goal description (optional),
+        "constraints": constraints dict (optional),
         "last_updated": timestamp
     }
     """
@@ -37,7 +111,13 @@ def load_progress(goal_id):
     return data.get(goal_id, {})
 
 
-def save_progress(goal_id, execution_matrix, computed_progress):
+def save_progress(
+    goal_id,
+    execution_matrix,
+    computed_progress,
+    goal=None,
+    constraints=None,
+):
     """
     Save execution-level progress.
 
@@ -46,16 +126,60 @@ def save_progress(goal_id, execution_matrix, computed_progress):
 
     computed_progress:
         milestone -> percentage (0–100)
+
+    goal / constraints (optional):
+        stored alongside the progress so headless clients can adapt
+        the plan later; previously stored values are kept when omitted.
     """
-    data = _load_all()
+    with _locked():
+        data = _load_all()
+        previous = data.get(goal_id, {})
 
-    data[goal_id] = {
-        "execution": execution_matrix,
-        "computed": computed_progress,
-        "last_updated": datetime.utcnow().isoformat()
-    }
+        record = {
+            "execution": execution_matrix,
+            "computed": computed_progress,
+        }
+        for key, value in (("goal", goal), ("constraints", constraints)):
+            if value is None:
+                value = previous.get(key)
+            if value is not None:
+                record[key] = value
+        record["last_updated"] = datetime.utcnow().isoformat()
+
+        data[goal_id] = record
+        _save_all(data)
+
+
+
+def patch_progress(goal_id, updates):
+    """
+    Tick or untick individual subtasks of a stored goal atomically.
 
-    _save_all(data)
+    updates:
+        milestone -> { subtask: bool }
+
+    Returns the updated record. Raises KeyError if the goal has no
+    execution progress, ValueError for unknown milestones or subtasks.
+    """
+    with _locked():
+        data = _load_all()
+        record = data.get(goal_id)
+        if not record or "execution" not in record:
+            raise KeyError(goal_id)
+
+        execution = record["execution"]
+        for milestone, subtasks in updates.items():
+            if milestone not in execution:
+                raise ValueError(f"Unknown milestone: {milestone}")
+            for subtask, done in subtasks.items():
+                if subtask not in execution[milestone]:
+                    raise ValueError(f"Unknown subtask: {subtask}")
+                execution[milestone][subtask] = done
+
+        record["computed"] = compute_progress(execution)
+        record["last_updated"] = datetime.utcnow().isoformat()
+        _save_all(data)
+        return record
 
 
 
@@ -68,3 +192,5 @@ def load_computed_progress(goal_id):
     """
     record = load_progress(goal_id)
     return record.get("computed", {})
+
+
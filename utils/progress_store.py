@@ -0,0 +1,497 @@
+"""
+Streaming access to progress records for backups, restores and migrations.
+
+progress_manager keeps the live app on data/progress.json; this module adds
+record-at-a-time readers and batched writers over that file and over SQLite,
+plus JSONL export/import with per-record checksums and resumable batches.
+Memory use is bounded by the largest single record, not the dataset.
+
+JSONL line format:
+    {"goal_id": ..., "record": {...}, "sha256": ...}
+with a final manifest line:
+    {"manifest": {"count": n, "fingerprint": ...}}
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+
+from utils import progress_manager
+
+READ_CHUNK_SIZE = 64 * 1024
+DEFAULT_BATCH_SIZE = 500
+
+
+class IntegrityError(Exception):
+    """
+    Raised when a checksum or manifest does not match the data.
+    """
+
+
+
+# Checksums
+def record_digest(goal_id, record):
+    """
+    Stable sha256 over a goal id and its record (key order independent).
+    """
+    canonical = json.dumps([goal_id, record], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class Fingerprint:
+    """
+    Order-independent running checksum over a stream of records, so two
+    stores can be compared without holding either in memory.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self._total = 0
+
+    def add(self, digest):
+        self.count += 1
+        self._total = (self._total + int(digest, 16)) % (1 << 256)
+
+    @property
+    def hexdigest(self):
+        return f"{self._total:064x}"
+
+    def as_dict(self):
+        return {"count": self.count, "fingerprint": self.hexdigest}
+
+
+
+# JSON File Backend
+def _iter_json_object(f):
+    """
+    Yield (key, value) pairs of a top-level JSON object without loading the
+    whole document.
+    """
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+
+    def more():
+        nonlocal buf, pos, eof
+        chunk = f.read(READ_CHUNK_SIZE)
+        if not chunk:
+            eof = True
+        buf = buf[pos:] + chunk
+        pos = 0
+
+    def skip_ws():
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos].isspace():
+                pos += 1
+            if pos < len(buf) or eof:
+                return
+            more()
+
+    def expect(chars):
+        nonlocal pos
+        skip_ws()
+        if pos >= len(buf) or buf[pos] not in chars:
+            raise ValueError(f"Malformed progress file: expected one of {chars!r}")
+        pos += 1
+        return buf[pos - 1]
+
+    def decode():
+        nonlocal pos
+        while True:
+            skip_ws()
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                more()
+                continue
+            # A value ending exactly at the buffer edge may be truncated.
+            if end < len(buf) or eof:
+                pos = end
+                return value
+            more()
+
+    more()
+    expect("{")
+    skip_ws()
+    if pos < len(buf) and buf[pos] == "}":
+        return
+
+    while True:
+        key = decode()
+        expect(":")
+        value = decode()
+        yield key, value
+        if expect(",}") == "}":
+            return
+
+
+def _json_entry(goal_id, record):
+    # Same layout json.dump(data, indent=4) produces for one entry.
+    return json.dumps({goal_id: record}, indent=4)[2:-2]
+
+
+class JsonProgressStore:
+    """
+    The progress.json file used by progress_manager.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or progress_manager.PROGRESS_FILE
+
+    def __repr__(self):
+        return f"JsonProgressStore({self.path!r})"
+
+    def iter_records(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r") as f:
+            yield from _iter_json_object(f)
+
+    @contextmanager
+    def bulk_writer(self, source=None):
+        """
+        Stream new records into a temp file, then merge in untouched existing
+        records and swap the file in atomically. The whole import is one
+        transaction, so an interrupted run leaves the file unchanged and is
+        resumed by simply running it again.
+        """
+        with progress_manager._locked(self.path), _spool() as spool:
+            with progress_manager._atomic_writer(self.path) as out:
+                writer = _JsonBatchWriter(out, spool)
+                out.write("{")
+                yield writer
+                for goal_id, record in self.iter_records():
+                    if not writer.written(goal_id):
+                        writer.write_entry(goal_id, record)
+                out.write("\n}" if writer.count else "}")
+
+
+class _JsonBatchWriter:
+    resume_position = 0
+
+    def __init__(self, out, spool):
+        self._out = out
+        # Ids already written are spooled to disk, not kept in a set, so
+        # memory stays constant however many records are imported.
+        self._spool = spool
+        self._spool.execute("CREATE TABLE written (goal_id TEXT PRIMARY KEY)")
+        self.count = 0
+
+    def written(self, goal_id):
+        return self._spool.execute("SELECT 1 FROM written WHERE goal_id = ?", (goal_id,)).fetchone() is not None
+
+    def write_entry(self, goal_id, record):
+        try:
+            self._spool.execute("INSERT INTO written VALUES (?)", (goal_id,))
+        except sqlite3.IntegrityError:
+            raise IntegrityError(f"Duplicate goal id in import: {goal_id!r}") from None
+        self._out.write(",\n" if self.count else "\n")
+        self._out.write(_json_entry(goal_id, record))
+        self.count += 1
+
+    def write_batch(self, records, position):
+        for goal_id, record in records:
+            self.write_entry(goal_id, record)
+
+
+
+# SQLite Backend
+class SqliteProgressStore:
+    """
+    Progress records in a SQLite table, one row per goal.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS progress (
+                    goal_id TEXT PRIMARY KEY,
+                    record TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS import_checkpoints (
+                    source TEXT PRIMARY KEY,
+                    position INTEGER NOT NULL
+                )
+                """
+            )
+
+    def __repr__(self):
+        return f"SqliteProgressStore({self.path!r})"
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def iter_records(self):
+        with self._connect() as conn:
+            for goal_id, record in conn.execute("SELECT goal_id, record FROM progress ORDER BY goal_id"):
+                yield goal_id, json.loads(record)
+
+    def get(self, goal_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT record FROM progress WHERE goal_id = ?", (goal_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    @contextmanager
+    def bulk_writer(self, source=None):
+        """
+        Each batch commits in its own transaction together with the import
+        position, so an interrupted import resumes after the last batch.
+        The checkpoint is cleared once the whole import succeeds.
+        """
+        with self._connect() as conn:
+            writer = _SqliteBatchWriter(conn, source)
+            yield writer
+            if source:
+                conn.execute("DELETE FROM import_checkpoints WHERE source = ?", (source,))
+
+
+class _SqliteBatchWriter:
+
+    def __init__(self, conn, source):
+        self._conn = conn
+        self._source = source
+        self.resume_position = 0
+        if source:
+            row = conn.execute(
+                "SELECT position FROM import_checkpoints WHERE source = ?", (source,)
+            ).fetchone()
+            self.resume_position = row[0] if row else 0
+
+    def write_batch(self, records, position):
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO progress (goal_id, record) VALUES (?, ?)",
+                ((goal_id, json.dumps(record)) for goal_id, record in records),
+            )
+            if self._source:
+                conn.execute(
+                    "INSERT OR REPLACE INTO import_checkpoints (source, position) VALUES (?, ?)",
+                    (self._source, position),
+                )
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+
+
+# Public API
+def open_store(path):
+    """
+    Open a store by file extension: .json for the progress file,
+    .db / .sqlite / .sqlite3 for SQLite.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".json":
+        return JsonProgressStore(path)
+    if ext in (".db", ".sqlite", ".sqlite3"):
+        return SqliteProgressStore(path)
+    raise ValueError(f"Unsupported progress store: {path}")
+
+
+def fingerprint_store(store):
+    fingerprint = Fingerprint()
+    for goal_id, record in store.iter_records():
+        fingerprint.add(record_digest(goal_id, record))
+    return fingerprint
+
+
+def export_jsonl(store, out):
+    """
+    Write every record of store to the text stream out as JSONL.
+    Returns the manifest dict written as the final line.
+    """
+    fingerprint = Fingerprint()
+    for goal_id, record in store.iter_records():
+        digest = record_digest(goal_id, record)
+        fingerprint.add(digest)
+        out.write(json.dumps({"goal_id": goal_id, "record": record, "sha256": digest}) + "\n")
+
+    manifest = fingerprint.as_dict()
+    out.write(json.dumps({"manifest": manifest}) + "\n")
+    return manifest
+
+
+def _batched(records, batch_size):
+    batch = []
+    for item in records:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _write_all(records, store, batch_size, source=None):
+    """
+    records yields (position, goal_id, record); positions must increase.
+    """
+    with store.bulk_writer(source) as writer:
+        pending = (r for r in records if r[0] >= writer.resume_position)
+        for batch in _batched(pending, batch_size):
+            writer.write_batch([(g, r) for _, g, r in batch], batch[-1][0] + 1)
+
+
+def iter_jsonl(f, verify=True):
+    """
+    Yield (position, goal_id, record) from an exported JSONL stream.
+
+    With verify (the default) every line must carry a matching sha256 and
+    the stream must end with a manifest matching what was read, so a
+    truncated or edited backup raises IntegrityError. verify=False accepts
+    hand-written files without checksums or manifest.
+    """
+    fingerprint = Fingerprint()
+    manifest = None
+
+    for position, line in enumerate(f):
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        if "manifest" in entry:
+            manifest = entry["manifest"]
+            continue
+
+        goal_id, record = entry["goal_id"], entry["record"]
+        digest = record_digest(goal_id, record)
+        if verify and entry.get("sha256") != digest:
+            problem = "Missing checksum" if "sha256" not in entry else "Checksum mismatch"
+            raise IntegrityError(f"{problem} on line {position + 1} ({goal_id!r})")
+        fingerprint.add(digest)
+        yield position, goal_id, record
+
+    if not verify:
+        return
+    if manifest is None:
+        raise IntegrityError("Missing manifest: the export is incomplete or was truncated")
+    if manifest != fingerprint.as_dict():
+        raise IntegrityError(
+            f"Manifest mismatch: file declares {manifest}, read {fingerprint.as_dict()}"
+        )
+
+
+def check_jsonl(path):
+    """
+    Validate every checksum and the manifest of an export without
+    writing anything. Returns the number of records.
+    """
+    with open(path, "r") as f:
+        return sum(1 for _ in iter_jsonl(f))
+
+
+def import_jsonl(path, store, batch_size=DEFAULT_BATCH_SIZE, verify=True):
+    """
+    Import an exported JSONL file into store in batches. Re-running after an
+    interruption resumes from the last committed batch where the store
+    supports it. Returns the number of records read.
+
+    With verify the whole file is checked first (one extra streaming read),
+    so a corrupt or truncated export is rejected before any batch commits.
+    """
+    if verify:
+        check_jsonl(path)
+
+    source = f"jsonl:{os.path.abspath(path)}"
+    count = 0
+
+    def counted(records):
+        nonlocal count
+        for item in records:
+            count += 1
+            yield item
+
+    with open(path, "r") as f:
+        _write_all(counted(iter_jsonl(f, verify)), store, batch_size, source)
+    return count
+
+
+def migrate(src, dst, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Copy every record from src to dst and verify the result.
+    Returns the source fingerprint dict.
+    """
+    fingerprint = Fingerprint()
+
+    def records():
+        for position, (goal_id, record) in enumerate(src.iter_records()):
+            fingerprint.add(record_digest(goal_id, record))
+            yield position, goal_id, record
+
+    _write_all(records(), dst, batch_size)
+    verify(src, dst)
+    return fingerprint.as_dict()
+
+
+@contextmanager
+def _spool():
+    """
+    Scratch SQLite database in a temporary directory, for data too large
+    to hold in memory. Removed on exit.
+    """
+    with tempfile.TemporaryDirectory(prefix="achievit-spool-") as tmp_dir:
+        conn = sqlite3.connect(os.path.join(tmp_dir, "spool.db"))
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+
+def _sorted_digests(store):
+    """
+    Yield (goal_id, digest) ordered by goal_id. SQLite already iterates in
+    order; other stores are spooled through a temporary SQLite table so the
+    sort happens on disk rather than in memory.
+    """
+    if isinstance(store, SqliteProgressStore):
+        for goal_id, record in store.iter_records():
+            yield goal_id, record_digest(goal_id, record)
+        return
+
+    with _spool() as conn:
+        conn.execute("CREATE TABLE digests (goal_id TEXT PRIMARY KEY, digest TEXT NOT NULL)")
+        for batch in _batched(store.iter_records(), DEFAULT_BATCH_SIZE):
+            conn.executemany(
+                "INSERT OR REPLACE INTO digests VALUES (?, ?)",
+                ((goal_id, record_digest(goal_id, record)) for goal_id, record in batch),
+            )
+        conn.commit()
+        yield from conn.execute("SELECT goal_id, digest FROM digests ORDER BY goal_id")
+
+
+def verify(src, dst):
+    """
+    Check that every record of src is present, unchanged, in dst.
+    Raises IntegrityError otherwise.
+
+    Both sides are streamed in goal_id order and merge-joined, so memory
+    stays constant however many records the stores hold.
+    """
+    dst_iter = _sorted_digests(dst)
+    dst_id, dst_digest = next(dst_iter, (None, None))
+
+    for goal_id, digest in _sorted_digests(src):
+        while dst_id is not None and dst_id < goal_id:
+            dst_id, dst_digest = next(dst_iter, (None, None))
+        if dst_id != goal_id or dst_digest != digest:
+            raise IntegrityError(f"Record {goal_id!r} is missing or differs in {dst!r}")